@@ -14,10 +14,13 @@ from database import Base
 
 from models.user_model import Users
 from models.flashcard_model import Flashcards
+from models.generation_job_model import GenerationJobs
+from models.play_notification_model import PlayNotifications
 from models.session_flashcards_model import SessionFlashcards
 from models.session_model import Sessions
 from models.subject_model import Subjects
 from models.topic_model import Topics
+from models.user_daily_usage_model import UserDailyUsage
 from models.survey_model import *
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,34 @@
+"""add duration seconds to sessions
+
+Revision ID: b7d9e0f1a2c3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-16 14:03:27.184562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d9e0f1a2c3'
+down_revision: Union[str, None] = 'a3f1c2d4e5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('duration_seconds', sa.Integer(), server_default='0', nullable=False, comment='Total time spent in the session, in seconds'))
+
+    op.execute(r"""
+        UPDATE sessions
+        SET duration_seconds = split_part(total_time_spent, ':', 1)::integer * 3600
+            + split_part(total_time_spent, ':', 2)::integer * 60
+            + split_part(total_time_spent, ':', 3)::integer
+        WHERE total_time_spent ~ '^\d+:\d+:\d+$'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('sessions', 'duration_seconds')
@@ -0,0 +1,49 @@
+"""add partial indexes for hot queries
+
+Revision ID: c4e8f2a9b1d7
+Revises: b7d9e0f1a2c3
+Create Date: 2026-10-16 15:21:08.662301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8f2a9b1d7'
+down_revision: Union[str, None] = 'b7d9e0f1a2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_flashcards_user_id_topic_id_created_at', 'flashcards', ['user_id', 'topic_id', 'created_at']),
+    ('ix_flashcards_topic_id', 'flashcards', ['topic_id']),
+    ('ix_sessions_user_id_created_at', 'sessions', ['user_id', sa.text('created_at DESC')]),
+    ('ix_sessions_topic_id_created_at', 'sessions', ['topic_id', sa.text('created_at DESC')]),
+    ('ix_topics_subject_id', 'topics', ['subject_id']),
+    ('ix_subjects_user_id_created_at', 'subjects', ['user_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text('deleted_at IS NULL'),
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,37 @@
+"""add daily usage index to flashcards
+
+Revision ID: d2a6b8c0e4f5
+Revises: c4e8f2a9b1d7
+Create Date: 2026-10-16 16:47:55.093718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6b8c0e4f5'
+down_revision: Union[str, None] = 'c4e8f2a9b1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_flashcards_user_id_created_at',
+            'flashcards',
+            ['user_id', 'created_at'],
+            unique=False,
+            postgresql_include=['origin'],
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_flashcards_user_id_created_at', table_name='flashcards', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""create user daily usage table
+
+Revision ID: e5f7a9c1b3d8
+Revises: d2a6b8c0e4f5
+Create Date: 2026-10-16 18:05:42.917364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a9c1b3d8'
+down_revision: Union[str, None] = 'd2a6b8c0e4f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_daily_usage',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('usage_date', sa.Date(), nullable=False),
+    sa.Column('flashcards_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('ai_flashcards_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('subjects_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'usage_date')
+    )
+
+    # Seed today's counters so quotas already spent today keep applying
+    op.execute("""
+        INSERT INTO user_daily_usage (user_id, usage_date, flashcards_count, ai_flashcards_count, subjects_count, updated_at)
+        SELECT usage.user_id, CURRENT_DATE, SUM(usage.flashcards), SUM(usage.ai_flashcards), SUM(usage.subjects), now()
+        FROM (
+            SELECT user_id, COUNT(*) AS flashcards, COUNT(*) FILTER (WHERE origin = 'ai') AS ai_flashcards, 0 AS subjects
+            FROM flashcards
+            WHERE created_at >= CURRENT_DATE AND created_at < CURRENT_DATE + 1 AND deleted_at IS NULL AND user_id IS NOT NULL
+            GROUP BY user_id
+            UNION ALL
+            SELECT user_id, 0, 0, COUNT(*)
+            FROM subjects
+            WHERE created_at >= CURRENT_DATE AND created_at < CURRENT_DATE + 1 AND deleted_at IS NULL AND user_id IS NOT NULL
+            GROUP BY user_id
+        ) AS usage
+        GROUP BY usage.user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_daily_usage')
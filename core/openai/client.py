@@ -4,10 +4,45 @@ from openai import OpenAI
 import dotenv
 import json
 from utils import constants
+from utils.utils import normalize_question, token_counter
 
 
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+HISTORY_STEM_LENGTH = 60
+
+def _question_of(flashcard) -> str:
+    if isinstance(flashcard, dict):
+        return flashcard.get('question') or ''
+    return str(flashcard)
+
+def compact_history(history: list, token_budget: int = None) -> str:
+    """
+    Renders the most recent questions of the history as short stems, one per
+    line, stopping at the token budget so the prompt does not grow with the run.
+    """
+    token_budget = token_budget if token_budget is not None else int(os.getenv('HISTORY_TOKEN_BUDGET', 400))
+
+    lines = []
+    seen_stems = set()
+    used_tokens = 0
+
+    for flashcard in reversed(history):
+        stem = normalize_question(_question_of(flashcard))[:HISTORY_STEM_LENGTH]
+        if not stem or stem in seen_stems:
+            continue
+
+        line = f"- {stem}"
+        line_tokens = token_counter(line) + 1
+        if used_tokens + line_tokens > token_budget:
+            break
+
+        seen_stems.add(stem)
+        lines.append(line)
+        used_tokens += line_tokens
+
+    return "\n".join(lines)
+
 def flash_card_generator(prompt: str, history: list, quantity: int, difficulty: int = 1):
     model = os.getenv('DEFAULT_MODEL')
     max_attempt = 3
@@ -15,6 +50,9 @@ def flash_card_generator(prompt: str, history: list, quantity: int, difficulty:
 
     difficulty_levels = {-1: 'fácil', 0: 'médio', 1: 'difícil', 2: 'muito difícil'}
 
+    history_section = compact_history(history)
+    history_keys = {normalize_question(_question_of(flashcard)) for flashcard in history}
+
     while True:
         try:
             system_prompt = f"""
@@ -25,8 +63,8 @@ def flash_card_generator(prompt: str, history: list, quantity: int, difficulty:
             ## Certifique-se de ter criado exatamente {quantity} flashcards. Deve ter exatamente {quantity} flashcards.
             ## Você SEMPRE deve entregar o resultado no formato JSON. Você SEMPRE deve retornar o resultado no formato JSON, contendo uma lista de flashcards no seguinte formato:
             {json.dumps(constants.FLASHCARDS_RESPONSE_TEMPLATE)}
-            ## Abaixo, está o histórico de flashcards gerados (caso haja conteúdo abaixo, não repita)
-            {str(history)}
+            ## Abaixo, está o início das perguntas já geradas (caso haja conteúdo abaixo, não repita)
+            {history_section}
             """
             response = client.chat.completions.create(
                 model=model,
@@ -51,7 +89,10 @@ def flash_card_generator(prompt: str, history: list, quantity: int, difficulty:
             )
 
             response = json.loads(response.choices[0].message.content)
-            flashcards = response['flashcards']
+            flashcards = [
+                flashcard for flashcard in response['flashcards']
+                if normalize_question(_question_of(flashcard)) not in history_keys
+            ]
             
             return flashcards
 
@@ -1,10 +1,13 @@
 import os
+import threading
+import time
 from typing import Annotated
 import dotenv
 from fastapi import Depends
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -14,7 +17,68 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL)
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waits for a connection, so
+    the pool can be sized against the number of workers and max_connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": self.overflow(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+
+def _engine_options() -> dict:
+    options = {
+        "poolclass": MeteredQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+    }
+
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+    if statement_timeout > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
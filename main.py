@@ -1,5 +1,6 @@
 import logging
 import os
+from contextlib import asynccontextmanager
 import dotenv
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.responses import JSONResponse
@@ -9,6 +10,7 @@ from routers import (
     flashcards,
     auth,
     logs,
+    metrics,
     subjects,
     subscriptions,
     topics,
@@ -18,15 +20,34 @@ from routers import (
     surveys
 )
 from jose import jwt, JWTError
+from services.job_queue import generation_job_queue
+from services.subscription_reconciler import subscription_reconciler
+from usecases.flashcards import FlashcardsUseCase
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    generation_job_queue.start(
+        handler=lambda db, job: FlashcardsUseCase(
+            db=db, origin='ai', user_id=str(job.user_id)
+        ).process_generation_job(job)
+    )
+    subscription_reconciler.start()
+    try:
+        yield
+    finally:
+        subscription_reconciler.stop()
+        generation_job_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 dotenv.load_dotenv()
 
 @app.middleware("http")
 async def middleware(request: Request, call_next):
-    if request.url.path in ["/logs", "/auth/signin", "/docs", "/openapi.json"]:
+    # /subscriptions/rtdn is called by Pub/Sub and checks its own push token
+    if request.url.path in ["/logs", "/auth/signin", "/docs", "/openapi.json", "/subscriptions/rtdn"]:
         return await call_next(request)
     
     token = request.headers.get("Authorization")
@@ -50,7 +71,8 @@ async def middleware(request: Request, call_next):
         )
 
     response = await call_next(request)
-    response.headers['Content-Type'] = 'application/json; charset=utf-8'
+    if response.headers.get('Content-Type') != 'application/x-ndjson':
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
 
     return response
 
@@ -64,5 +86,6 @@ app.include_router(sessions.router)
 app.include_router(feedbacks.router)
 app.include_router(users.router)
 app.include_router(logs.router)
+app.include_router(metrics.router)
 app.include_router(subscriptions.router)
 app.include_router(surveys.router)
@@ -1,6 +1,6 @@
 import uuid
 from database import Base
-from sqlalchemy import UUID, CheckConstraint, Column, ForeignKey, Boolean, Integer, String, DateTime, func, inspect
+from sqlalchemy import UUID, CheckConstraint, Column, ForeignKey, Boolean, Index, Integer, String, DateTime, func, inspect
 
 
 class Flashcards(Base):
@@ -23,6 +23,9 @@ class Flashcards(Base):
 
     __table_args__ = (
         CheckConstraint("origin IN ('user', 'ai')", name='check_origin_valid_values'),
+        Index('ix_flashcards_user_id_topic_id_created_at', user_id, topic_id, created_at, postgresql_where=deleted_at.is_(None)),
+        Index('ix_flashcards_topic_id', topic_id, postgresql_where=deleted_at.is_(None)),
+        Index('ix_flashcards_user_id_created_at', user_id, created_at, postgresql_include=['origin'], postgresql_where=deleted_at.is_(None)),
     )
 
     def to_dict(self):
@@ -0,0 +1,39 @@
+import uuid
+from database import Base
+from sqlalchemy import UUID, CheckConstraint, Column, ForeignKey, Integer, LargeBinary, String, DateTime, func, inspect
+
+
+class GenerationJobs(Base):
+    __tablename__ = 'generation_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete='CASCADE'), nullable=False, index=True)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False)
+    topic_id = Column(UUID(as_uuid=True), ForeignKey('topics.id', ondelete='CASCADE'), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    difficulty = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default='pending', index=True)
+    file_content = Column(LargeBinary)
+    attempts = Column(Integer, nullable=False, default=0)
+    fragments_total = Column(Integer, nullable=False, default=0)
+    fragments_done = Column(Integer, nullable=False, default=0)
+    cards_created = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed')",
+            name='check_generation_job_status_valid_values'
+        ),
+    )
+
+    def to_dict(self):
+        return {
+            c.key: getattr(self, c.key)
+            for c in inspect(self).mapper.column_attrs
+            if c.key != 'file_content'
+        }
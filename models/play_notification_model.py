@@ -0,0 +1,18 @@
+import uuid
+from database import Base
+from sqlalchemy import UUID, Column, DateTime, Integer, String, Text, func, inspect
+
+
+class PlayNotifications(Base):
+    __tablename__ = 'play_notifications'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
+    message_id = Column(String(255), nullable=False, unique=True, comment="Pub/Sub message ID, used to drop redeliveries")
+    package_name = Column(String(255))
+    purchase_token = Column(Text)
+    notification_type = Column(Integer)
+    event_time = Column(DateTime(timezone=True))
+    received_at = Column(DateTime(timezone=True), default=func.now())
+
+    def to_dict(self):
+        return {c.key: getattr(self, c.key) for c in inspect(self).mapper.column_attrs}
@@ -1,6 +1,18 @@
 import uuid
 from database import Base
-from sqlalchemy import UUID, Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import UUID, Column, DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import validates
+
+
+def duration_to_seconds(time_str: str) -> int:
+    """
+    Converts an "HH:MM:SS" duration to seconds; malformed values count as zero.
+    """
+    try:
+        hours, minutes, seconds = (int(part) for part in time_str.split(':'))
+    except (AttributeError, ValueError):
+        return 0
+    return hours * 3600 + minutes * 60 + seconds
 
 
 class Sessions(Base):
@@ -15,6 +27,7 @@ class Sessions(Base):
     incorrect_answer_count = Column(Integer, nullable=False, comment="Number of incorrect answers")
     total_questions = Column(Integer, nullable=False, comment="Total number of questions")
     total_time_spent = Column(String, nullable=False, comment="Total time spent in the session")
+    duration_seconds = Column(Integer, nullable=False, default=0, server_default='0', comment="Total time spent in the session, in seconds")
     easy_question_count = Column(Integer, nullable=False, comment="Number of easy questions")
     medium_question_count = Column(Integer, nullable=False, comment="Number of medium questions")
     hard_question_count = Column(Integer, nullable=False, comment="Number of hard questions")
@@ -22,6 +35,16 @@ class Sessions(Base):
     updated_at = Column(DateTime, comment="Record update date")
     deleted_at = Column(DateTime, comment="Record deletion date")
 
+    __table_args__ = (
+        Index('ix_sessions_user_id_created_at', user_id, created_at.desc(), postgresql_where=deleted_at.is_(None)),
+        Index('ix_sessions_topic_id_created_at', topic_id, created_at.desc(), postgresql_where=deleted_at.is_(None)),
+    )
+
+    @validates('total_time_spent')
+    def _sync_duration_seconds(self, key, value):
+        self.duration_seconds = duration_to_seconds(value)
+        return value
+
     def to_dict(self):
         """
         Converts a SQLAlchemy object to a dictionary.
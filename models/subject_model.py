@@ -2,7 +2,7 @@ import uuid
 
 from pydantic import BaseModel, Field
 from database import Base
-from sqlalchemy import UUID, Column, ForeignKey, Integer, String, DateTime, func, inspect
+from sqlalchemy import UUID, Column, ForeignKey, Index, Integer, String, DateTime, func, inspect
 
 
 class Subjects(Base):
@@ -16,5 +16,9 @@ class Subjects(Base):
     updated_at = Column(DateTime, default=func.now())
     deleted_at = Column(DateTime)
 
+    __table_args__ = (
+        Index('ix_subjects_user_id_created_at', user_id, created_at, postgresql_where=deleted_at.is_(None)),
+    )
+
     def to_dict(self):
         return {c.key: getattr(self, c.key) for c in inspect(self).mapper.column_attrs}
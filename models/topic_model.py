@@ -1,6 +1,6 @@
 import uuid
 from database import Base
-from sqlalchemy import UUID, Column, ForeignKey, String, DateTime, func, inspect
+from sqlalchemy import UUID, Column, ForeignKey, Index, String, DateTime, func, inspect
 
 
 class Topics(Base):
@@ -14,5 +14,9 @@ class Topics(Base):
     updated_at = Column(DateTime, default=func.now())
     deleted_at = Column(DateTime)
 
+    __table_args__ = (
+        Index('ix_topics_subject_id', subject_id, postgresql_where=deleted_at.is_(None)),
+    )
+
     def to_dict(self):
         return {c.key: getattr(self, c.key) for c in inspect(self).mapper.column_attrs}
\ No newline at end of file
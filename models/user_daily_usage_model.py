@@ -0,0 +1,16 @@
+from database import Base
+from sqlalchemy import UUID, Column, Date, DateTime, ForeignKey, Integer, func, inspect
+
+
+class UserDailyUsage(Base):
+    __tablename__ = 'user_daily_usage'
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete='CASCADE'), primary_key=True)
+    usage_date = Column(Date, primary_key=True)
+    flashcards_count = Column(Integer, nullable=False, default=0, server_default='0')
+    ai_flashcards_count = Column(Integer, nullable=False, default=0, server_default='0')
+    subjects_count = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {c.key: getattr(self, c.key) for c in inspect(self).mapper.column_attrs}
@@ -1,12 +1,18 @@
-from typing import Annotated, Optional
+import json
+from typing import Annotated, List, Optional
 from starlette import status
-from usecases.auth import get_current_user_usecase
+from uuid import UUID
+from models.requests_model import FlashcardsListRequest
+from models.user_model import Users
+from usecases.auth import get_current_user_model_usecase, get_current_user_usecase
 
 from usecases.flashcards import FlashcardsUseCase
-from utils import pdf_to_text
-from database import db_dependency
+from utils.utils import MAX_FILE_SIZE, validate_file_size
+from database import SessionLocal, db_dependency
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 
 router = APIRouter(
@@ -15,23 +21,29 @@ router = APIRouter(
 )
 
 user_dependency = Annotated[dict, Depends(get_current_user_usecase)]
+current_user_dependency = Annotated[Users, Depends(get_current_user_model_usecase)]
 
-@router.post("/generate", status_code=status.HTTP_201_CREATED)
+@router.post("/generate", status_code=status.HTTP_202_ACCEPTED)
 async def generate_flashcards(
         db: db_dependency, 
         user: user_dependency, 
+        current_user: current_user_dependency,
         file: UploadFile,
         quantity: int = Query(5, ge=1, le=30), 
         difficulty: int = Query(1, ge=0, le=2),
         subject_id: str = Query(..., description="ID da disciplina"), 
         topic_id: str = Query(..., description="ID do tópico")):
     
-    text_content = pdf_to_text(pdf=file.file)
+    if validate_file_size(file_obj=file.file, max_size_mb=MAX_FILE_SIZE // (1024 * 1024)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O arquivo PDF excede o limite de tamanho."
+        )
 
-    flashcards_usecase = FlashcardsUseCase(db=db, origin='ai', user_id=user.get('id'))
+    flashcards_usecase = FlashcardsUseCase(db=db, origin='ai', user_id=user.get('id'), user=current_user)
 
-    flashcards_list = flashcards_usecase.generate_flashcards(
-        content=text_content, 
+    job = flashcards_usecase.enqueue_generation_job(
+        file_content=file.file.read(), 
         quantity=quantity, 
         difficulty=difficulty,
         subject_id=subject_id,
@@ -39,12 +51,64 @@ async def generate_flashcards(
         user_id=user.get('id')
     )
 
-    return {"flashcards": flashcards_list}
+    return {"job_id": job['id'], "job": job}
+
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def retrieve_generation_job(user: user_dependency, db: db_dependency, job_id: UUID):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='authentication failed'
+        )
+
+    flashcards_usecase = FlashcardsUseCase(db=db)
+
+    return flashcards_usecase.retrieve_generation_job(user_id=user.get('id'), job_id=job_id)
+
+@router.post("/generate/stream", status_code=status.HTTP_201_CREATED)
+async def generate_flashcards_stream(
+        user: user_dependency, 
+        file: UploadFile,
+        quantity: int = Query(5, ge=1, le=30), 
+        difficulty: int = Query(1, ge=0, le=2),
+        subject_id: str = Query(..., description="ID da disciplina"), 
+        topic_id: str = Query(..., description="ID do tópico")):
+
+    # The stream outlives the request-scoped session, so it owns its own one
+    db = SessionLocal()
+    try:
+        flashcards_usecase = FlashcardsUseCase(db=db, origin='ai', user_id=user.get('id'))
+
+        flashcards_stream = flashcards_usecase.stream_flashcards(
+            pdf=file.file, 
+            quantity=quantity, 
+            difficulty=difficulty,
+            subject_id=subject_id,
+            topic_id=topic_id, 
+            user_id=user.get('id')
+        )
+    except Exception:
+        db.close()
+        raise
+
+    def ndjson_stream():
+        try:
+            for flashcard in flashcards_stream:
+                yield json.dumps(jsonable_encoder(flashcard)) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        ndjson_stream(),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/x-ndjson"
+    )
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def create_flashcards(
     db: db_dependency,
     user: user_dependency,
+    current_user: current_user_dependency,
     flashcard: str = Form(...),
     file: UploadFile = File(None)
 ):
@@ -55,7 +119,7 @@ async def create_flashcards(
         )
 
     try:
-        flashcards_usecase = FlashcardsUseCase(db=db, user_id=user.get('id'))
+        flashcards_usecase = FlashcardsUseCase(db=db, user_id=user.get('id'), user=current_user)
         flashcard_created = flashcards_usecase.create_flashcard(
             flashcard_request=flashcard,
             file=file
@@ -69,6 +133,24 @@ async def create_flashcards(
 
     return response
 
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def create_flashcards_bulk(
+    db: db_dependency,
+    user: user_dependency,
+    current_user: current_user_dependency,
+    flashcards_request: FlashcardsListRequest
+):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='authentication failed'
+        )
+
+    flashcards_usecase = FlashcardsUseCase(db=db, user_id=user.get('id'), user=current_user)
+    flashcards_created = flashcards_usecase.create_flashcards_bulk(flashcards_request=flashcards_request)
+
+    return {"flashcards": flashcards_created}
+
 @router.get("")
 async def retrieve_all_flashcards(
     user: user_dependency,
@@ -77,7 +159,9 @@ async def retrieve_all_flashcards(
     limit: Optional[int] = Query(default=15, ge=0),
     offset: int = Query(default=0, ge=0),
     difficulties: Optional[str] = Query(default=None),
-    ai_generated: Optional[bool] = Query(default=None)
+    ai_generated: Optional[bool] = Query(default=None),
+    cursor: Optional[str] = Query(default=None),
+    include_count: bool = Query(default=True)
 ):
     if not user:
         raise HTTPException(
@@ -85,38 +169,36 @@ async def retrieve_all_flashcards(
             detail='authentication failed'
         )
     
-    difficulties_list = None
-    if difficulties:
-        try:
-            difficulties_list = [int(d) for d in difficulties.split(",")]
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Formato de 'difficulties' inválido"
-            )
+    difficulties_list = _parse_difficulties(difficulties)
     
     flashcards_usecase = FlashcardsUseCase(db=db)
 
     try:
         if limit == 0:
-            result, count = flashcards_usecase.retrieve_all_flashcards(
+            response = flashcards_usecase.retrieve_flashcard_deck(
                 topic_id=topic_id,
                 user_id=user.get('id'),
-                limit=None,
-                offset=None,
                 difficulties=difficulties_list,
                 ai_generated=ai_generated
             )
         else:
-            result, count = flashcards_usecase.retrieve_all_flashcards(
+            result, count, next_cursor = flashcards_usecase.retrieve_all_flashcards(
                 topic_id=topic_id,
                 user_id=user.get('id'),
                 limit=limit,
                 offset=offset,
                 difficulties=difficulties_list,
-                ai_generated=ai_generated
+                ai_generated=ai_generated,
+                cursor=cursor,
+                include_count=include_count
             )
-        response = {"flashcards": result, "count": count}
+            response = {"flashcards": result}
+            if include_count:
+                response["count"] = count
+            if cursor is not None:
+                response["next_cursor"] = next_cursor
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,6 +207,57 @@ async def retrieve_all_flashcards(
 
     return response
 
+@router.get("/deck")
+async def retrieve_flashcard_deck(
+    user: user_dependency,
+    db: db_dependency,
+    topic_id: str = Query(...),
+    seed: Optional[int] = Query(default=None, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    difficulties: Optional[str] = Query(default=None),
+    ai_generated: Optional[bool] = Query(default=None)
+):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='authentication failed'
+        )
+
+    difficulties_list = _parse_difficulties(difficulties)
+
+    flashcards_usecase = FlashcardsUseCase(db=db)
+
+    try:
+        response = flashcards_usecase.retrieve_flashcard_deck(
+            topic_id=topic_id,
+            user_id=user.get('id'),
+            seed=seed,
+            limit=limit,
+            offset=offset,
+            difficulties=difficulties_list,
+            ai_generated=ai_generated
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error building flashcard deck: {str(e)}"
+        )
+
+    return response
+
+def _parse_difficulties(difficulties: Optional[str]) -> Optional[List[int]]:
+    if not difficulties:
+        return None
+
+    try:
+        return [int(d) for d in difficulties.split(",")]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato de 'difficulties' inválido"
+        )
+
 @router.delete("/{flashcard_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_flashcard(user: user_dependency, db: db_dependency, flashcard_id: str):
     if not user:
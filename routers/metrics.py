@@ -0,0 +1,26 @@
+from typing import Annotated
+from starlette import status
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from database import engine
+from usecases.auth import get_current_user_usecase
+from utils.pdf_cache import pdf_text_cache
+
+
+router = APIRouter(
+    prefix='/metrics',
+    tags=['metrics']
+)
+
+user_dependency = Annotated[dict, Depends(get_current_user_usecase)]
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def retrieve_metrics(user: user_dependency):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='authentication failed')
+
+    return {
+        "pdf_text_cache": pdf_text_cache.stats(),
+        "db_pool": engine.pool.stats()
+    }
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, Path, Query
 from starlette import status
 
@@ -33,13 +33,19 @@ async def retrieve_all_sessions(
     user: user_dependency,
     limit: int = Query(default=20, ge=1),
     offset: int = Query(default=0, ge=0),
-    search: str = Query(default=None)
+    search: str = Query(default=None),
+    cursor: Optional[str] = Query(default=None)
 ):
     try:
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='authentication failed')
-        sessions_list = retrieve_sessions_usecase(db, user_id=user.get('id'), limit=limit, offset=offset, search=search)
+        sessions_list, next_cursor = retrieve_sessions_usecase(
+            db, user_id=user.get('id'), limit=limit, offset=offset, search=search, cursor=cursor
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"error getting sessions: {str(e)}")
     
-    return sessions_list
\ No newline at end of file
+    if cursor is None:
+        return sessions_list
+
+    return {"sessions": sessions_list, "next_cursor": next_cursor}
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 import os
-from typing import Annotated
+from typing import Annotated, Optional
 from starlette import status
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
@@ -8,7 +8,8 @@ from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from core.firebase.client import firebase_file_upload
 from models.requests_model import SubjectRequest
 from models.subject_model import Subjects
-from usecases.auth import get_current_user_usecase
+from models.user_model import Users
+from usecases.auth import get_current_user_model_usecase, get_current_user_usecase
 from database import db_dependency
 from usecases.subjects import SubjectsUseCase
 
@@ -18,13 +19,19 @@ router = APIRouter(
 )
 
 user_dependency = Annotated[dict, Depends(get_current_user_usecase)]
+current_user_dependency = Annotated[Users, Depends(get_current_user_model_usecase)]
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_subject(db: db_dependency, user: user_dependency, subject_request: SubjectRequest):    
+async def create_subject(
+    db: db_dependency,
+    user: user_dependency,
+    current_user: current_user_dependency,
+    subject_request: SubjectRequest
+):    
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Authentication failed')
     
-    subjects_usecase = SubjectsUseCase(db=db, user_id=user.get('id'))
+    subjects_usecase = SubjectsUseCase(db=db, user_id=user.get('id'), user=current_user)
     response = subjects_usecase.create_subject_usecase(subject_request)
 
     return response
@@ -35,17 +42,21 @@ async def retrieve_all_subjects(
     db: db_dependency,
     limit: int = Query(default=15, ge=1),
     offset: int = Query(default=0, ge=0),
-    search: str = Query(default=None)
+    search: str = Query(default=None),
+    cursor: Optional[str] = Query(default=None)
 ):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Authentication failed')
     
     subjects_usecase = SubjectsUseCase(db=db, user_id=user.get('id'))
-    response = subjects_usecase.retrieve_all_subjects_usecase(
-        limit=limit, offset=offset, search=search
+    subjects, next_cursor = subjects_usecase.retrieve_all_subjects_usecase(
+        limit=limit, offset=offset, search=search, cursor=cursor
     )
 
-    return response
+    if cursor is None:
+        return subjects
+
+    return {"subjects": subjects, "next_cursor": next_cursor}
 
 @router.put("/{subject_id}")
 async def update_subject(user: user_dependency, db: db_dependency, subject_request: SubjectRequest, subject_id: str):
@@ -1,6 +1,8 @@
-from typing import Annotated
+import hmac
+import os
+from typing import Annotated, Any, Dict
 from starlette import status
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from database import db_dependency
 from usecases.auth import get_current_user_usecase
 from usecases.subscriptions import SubscriptionUseCase
@@ -95,3 +97,30 @@ async def get_user_subscriptions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao buscar assinaturas: {str(e)}"
         )
+
+
+@router.post("/rtdn", status_code=status.HTTP_200_OK)
+async def receive_rtdn(
+    db: db_dependency,
+    envelope: Dict[str, Any] = Body(...),
+    token: str = Query(default=None, description="Token configurado na push subscription do Pub/Sub")
+):
+    expected_token = os.getenv('RTDN_PUSH_TOKEN')
+    if not expected_token or not token or not hmac.compare_digest(token, expected_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Authentication failed'
+        )
+
+    try:
+        subscription_usecase = SubscriptionUseCase()
+        return subscription_usecase.process_rtdn(db=db, envelope=envelope)
+    except (ValueError, KeyError) as e:
+        # Malformed payloads are acknowledged, since redelivering them cannot help
+        print(f"Notificação RTDN inválida: {str(e)}")
+        return {"status": "invalid"}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar notificação: {str(e)}"
+        )
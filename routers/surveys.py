@@ -5,7 +5,8 @@ from uuid import UUID
 from schemas.survey_schemas import (
     CreateSurveyRequest, VoteRequest, SurveyResponse, 
 )
-from usecases.auth import get_current_user_usecase
+from models.user_model import Users
+from usecases.auth import get_current_user_model_usecase, get_current_user_usecase
 from database import db_dependency
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -19,6 +20,7 @@ router = APIRouter(
 )
 
 user_dependency = Annotated[dict, Depends(get_current_user_usecase)]
+current_user_dependency = Annotated[Users, Depends(get_current_user_model_usecase)]
 
 
 @router.get("/current", response_model=SurveyResponse)
@@ -68,12 +70,17 @@ async def get_survey_by_id(survey_id: UUID, db: db_dependency, user: user_depend
 
 ##################################### ⚠️ Admin routes ⚠️ #####################################
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=SurveyResponse)
-async def create_survey(db: db_dependency, user: user_dependency, survey_data: CreateSurveyRequest):
+async def create_survey(
+    db: db_dependency,
+    user: user_dependency,
+    current_user: current_user_dependency,
+    survey_data: CreateSurveyRequest
+):
     if not user:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin access required')
     
     try:
-        survey_usecase = SurveyUseCase(db=db)
+        survey_usecase = SurveyUseCase(db=db, user=current_user)
         survey = survey_usecase.create_survey(survey_data=survey_data, user_id=user.get('id'))
         return survey
     except Exception as e:
@@ -1,7 +1,8 @@
 from typing import Annotated
 from starlette import status
 from models.requests_model import UserRequest
-from usecases.auth import get_current_user_usecase
+from models.user_model import Users
+from usecases.auth import get_current_user_model_usecase, get_current_user_usecase
 from usecases.user import UserUseCase
 from database import db_dependency
 
@@ -13,14 +14,15 @@ router = APIRouter(
 )
 
 user_dependency = Annotated[dict, Depends(get_current_user_usecase)]
+current_user_dependency = Annotated[Users, Depends(get_current_user_model_usecase)]
 
 @router.get("")
-async def retrieve_user(user: user_dependency, db: db_dependency):
+async def retrieve_user(user: user_dependency, current_user: current_user_dependency, db: db_dependency):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='authentication failed')
 
     try:
-        user_usecase = UserUseCase(db)
+        user_usecase = UserUseCase(db, user=current_user)
         user_data = user_usecase.retrieve_user_usecase(user_id=user.get('id'))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"error getting user: {str(e)}")
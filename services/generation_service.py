@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.openai import client as openai_client
+from utils.utils import normalize_question
+
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class FlashcardGenerationService:
+    def __init__(self, difficulty: int = 1, max_workers: int = None):
+        self.difficulty = difficulty
+        self.max_workers = max_workers or int(os.getenv('GENERATION_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
+    @staticmethod
+    def _question_key(flashcard: dict) -> str:
+        return normalize_question(flashcard.get('question') or '')
+
+    def _generate_fragment(self, fragment: str, quantity: int, history: List[dict]) -> List[dict]:
+        flashcards_list = openai_client.flash_card_generator(
+            prompt=fragment,
+            history=history,
+            quantity=quantity,
+            difficulty=self.difficulty
+        )
+
+        if not isinstance(flashcards_list, list):
+            print(f"Erro ao gerar flashcards do fragmento: {flashcards_list}")
+            return []
+
+        return flashcards_list[:quantity]
+
+    def iter_generated(
+        self,
+        fragments: Iterable[str],
+        quantity: int,
+        expected_fragments: Optional[int] = None
+    ) -> Iterator[Tuple[int, List[dict]]]:
+        """
+        Sends the fragments to the model in parallel and yields, for each
+        fragment as soon as its call returns, its index and the flashcards that
+        were not already generated by another fragment.
+
+        Fragments are pulled lazily, one ahead of the one being sent, so a
+        generator can feed the model while it is still producing them and is
+        always read to the end. The quantity is spread evenly over the expected
+        fragments; once the estimate is passed the document is assumed to be as
+        long again as what was read so far, and the last fragment is asked for
+        the rest.
+        """
+        if expected_fragments is None:
+            fragments = list(fragments)
+            expected_fragments = len(fragments)
+
+        if not expected_fragments or quantity <= 0:
+            return
+
+        seen_questions = set()
+        accepted_flashcards: List[dict] = []
+        generated_count = 0
+
+        def collect(future: Future) -> List[dict]:
+            nonlocal generated_count
+
+            flashcards = []
+            for flashcard in future.result():
+                if generated_count >= quantity:
+                    break
+
+                key = self._question_key(flashcard)
+                if not key or key in seen_questions:
+                    continue
+
+                seen_questions.add(key)
+                flashcards.append(flashcard)
+                accepted_flashcards.append(flashcard)
+                generated_count += 1
+
+            return flashcards
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures: Dict[Future, int] = {}
+        assigned_quantity = 0
+        fragments = iter(fragments)
+        next_fragment = next(fragments, None)
+        index = -1
+        try:
+            while next_fragment is not None:
+                index += 1
+                fragment, next_fragment = next_fragment, next(fragments, None)
+
+                if next_fragment is None:
+                    target_quantity = quantity
+                else:
+                    if index >= expected_fragments - 1:
+                        expected_fragments = 2 * (index + 1)
+                    target_quantity = (index + 1) * quantity // expected_fragments
+
+                share = target_quantity - assigned_quantity
+                if share <= 0:
+                    continue
+                assigned_quantity = target_quantity
+
+                # Keep at most one fragment per worker in flight so a long
+                # document does not pile up in memory ahead of the model
+                while len(futures) >= self.max_workers:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield futures.pop(future), collect(future)
+
+                future = executor.submit(self._generate_fragment, fragment, share, list(accepted_flashcards))
+                futures[future] = index
+
+            for future in as_completed(list(futures)):
+                yield futures.pop(future), collect(future)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate(
+        self,
+        fragments: Iterable[str],
+        quantity: int,
+        expected_fragments: Optional[int] = None
+    ) -> List[dict]:
+        results = sorted(
+            self.iter_generated(fragments, quantity, expected_fragments),
+            key=lambda result: result[0]
+        )
+
+        return [flashcard for _, flashcards in results for flashcard in flashcards]
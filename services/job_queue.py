@@ -0,0 +1,131 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.generation_job_model import GenerationJobs
+
+
+class GenerationJobQueue:
+    """
+    Database-backed queue for AI generation jobs, processed by a pool of
+    in-process worker threads.
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several workers
+    (or several app processes) can share the same table. A running job whose
+    updated_at stops moving is considered abandoned and is claimed again, which
+    is how jobs survive restarts.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, workers: int = None, poll_interval: float = None, stale_after: int = None):
+        self.workers = workers or int(os.getenv('GENERATION_JOB_WORKERS', 2))
+        self.poll_interval = poll_interval or float(os.getenv('GENERATION_JOB_POLL_SECONDS', 2))
+        self.stale_after = timedelta(seconds=stale_after or int(os.getenv('GENERATION_JOB_STALE_SECONDS', 600)))
+        self._handler: Optional[Callable[[Session, GenerationJobs], None]] = None
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    def start(self, handler: Callable[[Session, GenerationJobs], None]) -> None:
+        if self._threads:
+            return
+
+        self._handler = handler
+        self._stop_event.clear()
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"generation-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+
+        for thread in self._threads:
+            thread.join(timeout=self.poll_interval)
+
+        self._threads = []
+
+    def enqueue(self, db: Session, **fields) -> GenerationJobs:
+        job = GenerationJobs(**fields, status='pending')
+
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self._wake_event.set()
+
+        return job
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                processed = self._process_next()
+            except Exception as e:
+                print(f"Erro no worker de geração: {e}")
+                processed = False
+
+            if not processed:
+                self._wake_event.wait(self.poll_interval)
+                self._wake_event.clear()
+
+    def _claim(self, db: Session) -> Optional[GenerationJobs]:
+        now = datetime.now(timezone.utc)
+
+        job = db.query(GenerationJobs).filter(
+            or_(
+                GenerationJobs.status == 'pending',
+                and_(
+                    GenerationJobs.status == 'running',
+                    GenerationJobs.updated_at < now - self.stale_after
+                )
+            )
+        ).order_by(GenerationJobs.created_at).with_for_update(skip_locked=True).first()
+
+        if not job:
+            return None
+
+        job.attempts += 1
+        job.status = 'running'
+        job.started_at = now
+        job.updated_at = now
+        db.commit()
+
+        return job
+
+    def _process_next(self) -> bool:
+        db = SessionLocal()
+        try:
+            job = self._claim(db)
+            if not job:
+                return False
+
+            try:
+                if job.attempts > self.MAX_ATTEMPTS:
+                    raise RuntimeError('maximum number of attempts reached')
+
+                self._handler(db, job)
+                job.status = 'completed'
+            except Exception as e:
+                db.rollback()
+                job.status = 'failed'
+                job.error = str(getattr(e, 'detail', e))
+
+            job.file_content = None
+            job.finished_at = datetime.now(timezone.utc)
+            job.updated_at = job.finished_at
+            db.commit()
+
+            return True
+        finally:
+            db.close()
+
+
+generation_job_queue = GenerationJobQueue()
@@ -1,11 +1,21 @@
 from datetime import date
-from sqlalchemy import cast, Date
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException
 
+from models.user_daily_usage_model import UserDailyUsage
 from utils.constants import USER_LIMITS
 
 
 class LimitService:
+    """
+    Daily quotas backed by the user_daily_usage counters.
+
+    Checks read the user's row for today by primary key. Reservations lock that
+    row and increment it in the caller's transaction, so they only take effect
+    when the caller commits its inserts and concurrent requests cannot both
+    spend the last units of a quota.
+    """
+
     def __init__(self, db, user, flashcard_model, subject_model):
         self.db = db
         self.user = user
@@ -13,37 +23,85 @@ class LimitService:
         self.Subjects = subject_model
         self.limits = USER_LIMITS[user.account_type]
 
-    def _count(self, model, **filters):
-        return self.db.query(model).filter_by(**filters).filter(
-            cast(model.created_at, Date) == date.today(),
-            model.deleted_at.is_(None)
-        ).count()
+    def _get_counters(self, for_update=False):
+        query = self.db.query(UserDailyUsage).filter(
+            UserDailyUsage.user_id == self.user.id,
+            UserDailyUsage.usage_date == date.today()
+        )
+
+        if for_update:
+            self.db.execute(
+                insert(UserDailyUsage)
+                .values(user_id=self.user.id, usage_date=date.today())
+                .on_conflict_do_nothing(index_elements=['user_id', 'usage_date'])
+            )
+            query = query.populate_existing().with_for_update()
+
+        return query.first()
 
     def get_usage(self):
-        usage = {}
+        counters = self._get_counters()
 
-        usage['flashcards'] = (self._count(self.Flashcards, user_id=self.user.id),
-                               self.limits['daily_flashcards_limit'])
-        usage['ai_flashcards'] = (self._count(self.Flashcards, user_id=self.user.id, origin='ai'),
-                                  self.limits['daily_ai_gen_flashcards_limit'])
-        usage['subjects'] = (self._count(self.Subjects, user_id=self.user.id),
-                             self.limits['daily_subjects_limit'])
-        return usage
+        return {
+            'flashcards': (counters.flashcards_count if counters else 0,
+                           self.limits['daily_flashcards_limit']),
+            'ai_flashcards': (counters.ai_flashcards_count if counters else 0,
+                              self.limits['daily_ai_gen_flashcards_limit']),
+            'subjects': (counters.subjects_count if counters else 0,
+                         self.limits['daily_subjects_limit'])
+        }
 
-    
-    def check_flashcard_quota(self, origin='manual', quantity=1):
-        used, limit = self.get_usage()['ai_flashcards' if origin == 'ai' else 'flashcards']
+    @staticmethod
+    def _flashcard_quota_key(origin):
+        return 'ai_flashcards' if origin == 'ai' else 'flashcards'
+
+    @staticmethod
+    def _available_flashcards(origin, used, limit, quantity):
         available = limit - used
-        
+
         if quantity > available:
             if available <= 0:
                 detail = 'AI generated flashcards limit reached' if origin == 'ai' else 'Flashcard limit reached'
                 raise HTTPException(status_code=400, detail=detail)
             return available
-        
+
         return quantity
 
+    def check_flashcard_quota(self, origin='manual', quantity=1):
+        used, limit = self.get_usage()[self._flashcard_quota_key(origin)]
+        return self._available_flashcards(origin, used, limit, quantity)
+
+    def reserve_flashcards(self, origin='manual', quantity=1):
+        """
+        Reserves up to quantity flashcards of today's quota and returns how many
+        were granted. AI flashcards count towards both flashcard counters.
+        """
+        counters = self._get_counters(for_update=True)
+
+        if origin == 'ai':
+            used, limit = counters.ai_flashcards_count, self.limits['daily_ai_gen_flashcards_limit']
+        else:
+            used, limit = counters.flashcards_count, self.limits['daily_flashcards_limit']
+
+        granted = self._available_flashcards(origin, used, limit, quantity)
+
+        counters.flashcards_count += granted
+        if origin == 'ai':
+            counters.ai_flashcards_count += granted
+        self.db.flush()
+
+        return granted
+
     def check_subject_quota(self):
         used, limit = self.get_usage()['subjects']
         if used + 1 > limit:
             raise HTTPException(status_code=400, detail='Subjects limit reached')
+
+    def reserve_subject(self):
+        counters = self._get_counters(for_update=True)
+
+        if counters.subjects_count + 1 > self.limits['daily_subjects_limit']:
+            raise HTTPException(status_code=400, detail='Subjects limit reached')
+
+        counters.subjects_count += 1
+        self.db.flush()
@@ -0,0 +1,189 @@
+import os
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.flashcard_model import Flashcards
+from utils.utils import normalize_question
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHashLSHIndex:
+    """
+    MinHash signatures of character shingles, bucketed with LSH bands, so the
+    near-duplicates of a text are found without comparing it to every entry.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, shingle_size: int = 3):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        generator = random.Random(1)
+        self._permutations = [
+            (generator.randint(1, _MERSENNE_PRIME - 1), generator.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [defaultdict(set) for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _shingles(self, text: str) -> Set[bytes]:
+        normalized = normalize_question(text)
+        if len(normalized) <= self.shingle_size:
+            return {normalized.encode()}
+
+        return {
+            normalized[index:index + self.shingle_size].encode()
+            for index in range(len(normalized) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(shingle) for shingle in self._shingles(text)]
+
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, item_id: str, text: str) -> None:
+        self.remove(item_id)
+
+        signature = self.signature(text)
+        self._signatures[item_id] = signature
+
+        for band, key in self._band_keys(signature):
+            self._buckets[band][key].add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        signature = self._signatures.pop(item_id, None)
+        if signature is None:
+            return
+
+        for band, key in self._band_keys(signature):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Returns the most similar indexed item and its estimated Jaccard
+        similarity, or None when nothing reaches the threshold.
+        """
+        signature = self.signature(text)
+
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates |= self._buckets[band].get(key, set())
+
+        best = None
+        for item_id in candidates:
+            other = self._signatures[item_id]
+            similarity = sum(1 for left, right in zip(signature, other) if left == right) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (item_id, similarity)
+
+        return best
+
+
+class FlashcardSimilarityIndex:
+    """
+    One MinHashLSHIndex per topic over the questions of its flashcards.
+
+    Each index is built from the flashcards table the first time its topic is
+    checked and then kept current by add/remove calls on insert, update and
+    delete. Indexes are rebuilt after max_age seconds to pick up changes made by
+    other processes, and only the most recently used topics are kept.
+    """
+
+    def __init__(self, max_topics: int = None, max_age: int = None, threshold: float = None):
+        self.max_topics = max_topics or int(os.getenv('SIMILARITY_INDEX_MAX_TOPICS', 256))
+        self.max_age = max_age or int(os.getenv('SIMILARITY_INDEX_MAX_AGE_SECONDS', 600))
+        self.threshold = threshold or float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0.8))
+        self._indexes: "OrderedDict[str, Tuple[float, MinHashLSHIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _new_index(self) -> MinHashLSHIndex:
+        return MinHashLSHIndex(threshold=self.threshold)
+
+    def _get_index(self, db, topic_id) -> MinHashLSHIndex:
+        topic_key = str(topic_id)
+
+        with self._lock:
+            entry = self._indexes.get(topic_key)
+            if entry and time.monotonic() - entry[0] < self.max_age:
+                self._indexes.move_to_end(topic_key)
+                return entry[1]
+
+        index = self._new_index()
+        flashcards = db.query(Flashcards.id, Flashcards.question).filter(
+            Flashcards.topic_id == topic_id,
+            Flashcards.deleted_at.is_(None)
+        ).all()
+        for flashcard_id, question in flashcards:
+            index.add(str(flashcard_id), question)
+
+        with self._lock:
+            self._indexes[topic_key] = (time.monotonic(), index)
+            while len(self._indexes) > self.max_topics:
+                self._indexes.popitem(last=False)
+
+        return index
+
+    def filter_new(self, db, topic_id, flashcards: List[dict]) -> List[dict]:
+        """
+        Drops the flashcards whose question is a near-duplicate of a flashcard
+        already in the topic or of an earlier flashcard of the same batch.
+        """
+        index = self._get_index(db, topic_id)
+        batch_index = self._new_index()
+
+        accepted = []
+        for position, flashcard in enumerate(flashcards):
+            question = flashcard.get('question') or ''
+
+            with self._lock:
+                duplicate = index.query(question)
+            if duplicate or batch_index.query(question):
+                continue
+
+            batch_index.add(str(position), question)
+            accepted.append(flashcard)
+
+        return accepted
+
+    def add(self, topic_id, flashcard_id, question: str) -> None:
+        with self._lock:
+            entry = self._indexes.get(str(topic_id))
+            if entry:
+                entry[1].add(str(flashcard_id), question)
+
+    def remove(self, topic_id, flashcard_id) -> None:
+        with self._lock:
+            entry = self._indexes.get(str(topic_id))
+            if entry:
+                entry[1].remove(str(flashcard_id))
+
+    def drop_topic(self, topic_id) -> None:
+        with self._lock:
+            self._indexes.pop(str(topic_id), None)
+
+
+flashcard_similarity_index = FlashcardSimilarityIndex()
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from cachetools import TLRUCache
+
+from services.subscription_service import GooglePlaySubscriptionError, SubscriptionData, SubscriptionStatusInfo
+
+
+SubscriptionInfo = Tuple[SubscriptionData, SubscriptionStatusInfo]
+
+
+class SubscriptionStatusCache:
+    """
+    Cache of Google Play subscription lookups, keyed by purchase token.
+
+    An active subscription is kept until its expiration_date (capped by
+    max_ttl, so cancellations made outside the app are still picked up), and
+    inactive subscriptions and lookup errors only for negative_ttl seconds.
+    """
+
+    def __init__(self, max_entries: int = None, max_ttl: int = None, negative_ttl: int = None):
+        self.max_entries = max_entries or int(os.getenv('SUBSCRIPTION_CACHE_MAX_ENTRIES', 10000))
+        self.max_ttl = max_ttl or int(os.getenv('SUBSCRIPTION_CACHE_MAX_TTL_SECONDS', 3600))
+        self.negative_ttl = negative_ttl or int(os.getenv('SUBSCRIPTION_CACHE_NEGATIVE_TTL_SECONDS', 60))
+        self._cache = TLRUCache(maxsize=self.max_entries, ttu=self._time_to_use, timer=time.monotonic)
+        self._lock = threading.Lock()
+
+    def _time_to_use(self, purchase_token: str, value, now: float) -> float:
+        if isinstance(value, GooglePlaySubscriptionError) or not value[1].is_active:
+            return now + self.negative_ttl
+
+        remaining = (value[1].expiration_date - datetime.now(timezone.utc)).total_seconds()
+        return now + max(0.0, min(remaining, self.max_ttl))
+
+    def get_or_fetch(
+        self,
+        purchase_token: str,
+        fetch: Callable[[], SubscriptionInfo]
+    ) -> SubscriptionInfo:
+        """
+        Returns the cached lookup for the token, calling fetch on a miss.
+        A cached error is raised again just as fetch raised it.
+        """
+        with self._lock:
+            value = self._cache.get(purchase_token)
+
+        if value is None:
+            try:
+                value = fetch()
+            except GooglePlaySubscriptionError as e:
+                value = e
+
+            self.put(purchase_token, value)
+
+        if isinstance(value, GooglePlaySubscriptionError):
+            raise value
+
+        return value
+
+    def put(self, purchase_token: str, value) -> None:
+        with self._lock:
+            self._cache[purchase_token] = value
+
+    def invalidate(self, purchase_token: Optional[str]) -> None:
+        with self._lock:
+            self._cache.pop(purchase_token, None)
+
+
+subscription_status_cache = SubscriptionStatusCache()
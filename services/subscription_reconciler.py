@@ -0,0 +1,210 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.subscription_model import SubscriptionModel
+from models.user_model import Users
+from services.subscription_cache import subscription_status_cache
+from services.subscription_service import GooglePlaySubscriptionError, SubscriptionService
+
+
+class SubscriptionReconciler:
+    """
+    Background worker that re-verifies with Google Play the active
+    subscriptions close to (or past) their expiration_date and keeps
+    SubscriptionModel and Users.account_type current, so request paths can
+    just read the stored tier.
+
+    Due subscriptions are claimed in batches by bumping their updated_at under
+    SELECT ... FOR UPDATE SKIP LOCKED, so several app processes can run the
+    reconciler side by side, and a subscription is not checked again before
+    recheck_after seconds. The Google calls of a batch run on a bounded pool.
+    """
+
+    def __init__(
+        self,
+        subscription_service: SubscriptionService = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = None,
+        horizon: int = None,
+        recheck_after: int = None,
+        batch_size: int = None,
+        max_workers: int = None
+    ):
+        self.subscription_service = subscription_service or SubscriptionService()
+        self.session_factory = session_factory
+        self.interval = interval or float(os.getenv('SUBSCRIPTION_RECONCILE_INTERVAL_SECONDS', 300))
+        self.horizon = timedelta(seconds=horizon or int(os.getenv('SUBSCRIPTION_RECONCILE_HORIZON_SECONDS', 3600)))
+        self.recheck_after = timedelta(
+            seconds=recheck_after or int(os.getenv('SUBSCRIPTION_RECONCILE_RECHECK_SECONDS', 900))
+        )
+        self.batch_size = batch_size or int(os.getenv('SUBSCRIPTION_RECONCILE_BATCH_SIZE', 100))
+        self.max_workers = max_workers or int(os.getenv('SUBSCRIPTION_RECONCILE_WORKERS', 4))
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        if self._thread:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="subscription-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Erro na reconciliação de assinaturas: {e}")
+
+            self._stop_event.wait(self.interval)
+
+    def run_once(self) -> int:
+        """
+        Reconciles every due subscription and returns how many were checked.
+        """
+        reconciled = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stop_event.is_set():
+                db = self.session_factory()
+                try:
+                    claimed = self._claim(db)
+                    if not claimed:
+                        break
+
+                    results = dict(zip(
+                        (subscription_id for subscription_id, _, _ in claimed),
+                        executor.map(self._fetch, claimed)
+                    ))
+                    self._apply(db, results)
+                    reconciled += len(claimed)
+                except Exception:
+                    db.rollback()
+                    raise
+                finally:
+                    db.close()
+
+        return reconciled
+
+    def _claim(self, db: Session) -> List[Tuple]:
+        now = datetime.now(timezone.utc)
+
+        subscriptions = db.query(SubscriptionModel).filter(
+            SubscriptionModel.is_active == True,
+            SubscriptionModel.deleted_at.is_(None),
+            SubscriptionModel.expiration_date < now + self.horizon,
+            or_(
+                SubscriptionModel.updated_at.is_(None),
+                SubscriptionModel.updated_at < now - self.recheck_after
+            )
+        ).order_by(SubscriptionModel.expiration_date).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        # Plain values, so the pool threads never touch the session
+        claimed = [
+            (subscription.id, subscription.package_name, subscription.purchase_token)
+            for subscription in subscriptions
+        ]
+
+        for subscription in subscriptions:
+            subscription.updated_at = now
+        db.commit()
+
+        return claimed
+
+    def _fetch(self, claimed: Tuple) -> Tuple:
+        _, package_name, purchase_token = claimed
+        try:
+            return self.subscription_service.get_complete_subscription_info(package_name, purchase_token), None
+        except GooglePlaySubscriptionError as e:
+            return None, e
+
+    def _apply(self, db: Session, results: dict) -> None:
+        now = datetime.now(timezone.utc)
+
+        subscriptions = db.query(SubscriptionModel).filter(
+            SubscriptionModel.id.in_(list(results))
+        ).with_for_update().all()
+
+        for subscription in subscriptions:
+            subscription_info, error = results[subscription.id]
+            if error is not None:
+                # A failed lookup is retried on a later pass; only a subscription
+                # that has already expired is deactivated in the meantime
+                print(f"Erro ao reconciliar assinatura {subscription.id}: {error}")
+                if subscription.expiration_date <= now:
+                    subscription.is_active = False
+                continue
+
+            apply_subscription_info(subscription, subscription_info)
+
+        db.flush()
+        sync_account_types(db, {subscription.user_id for subscription in subscriptions})
+        db.commit()
+
+
+def apply_subscription_info(subscription: SubscriptionModel, subscription_info: Tuple) -> None:
+    """
+    Copies a Google Play lookup onto the stored subscription and refreshes the
+    cached status of its purchase token.
+    """
+    subscription_data, status_info = subscription_info
+
+    subscription.subscription_state = subscription_data.subscription_state.value
+    subscription.expiration_date = subscription_data.expiration_date
+    subscription.auto_renewing = subscription_data.auto_renewing
+    subscription.is_active = status_info.is_active
+    subscription.updated_at = datetime.now(timezone.utc)
+
+    if subscription_data.price:
+        subscription.currency_code = subscription_data.price.currency_code
+        subscription.price_nanos = subscription_data.price.nanos
+
+    subscription_status_cache.put(subscription.purchase_token, subscription_info)
+
+
+def sync_account_types(db: Session, user_ids: set) -> None:
+    """
+    Sets account_type of the given users from whether they still have an
+    active, unexpired subscription.
+    """
+    now = datetime.now(timezone.utc)
+
+    premium_user_ids = {
+        user_id for user_id, in db.query(SubscriptionModel.user_id).filter(
+            SubscriptionModel.user_id.in_(user_ids),
+            SubscriptionModel.is_active == True,
+            SubscriptionModel.deleted_at.is_(None),
+            SubscriptionModel.expiration_date > now
+        ).distinct().all()
+    }
+
+    if premium_user_ids:
+        db.query(Users).filter(
+            Users.id.in_(premium_user_ids),
+            Users.account_type != 1
+        ).update({"account_type": 1}, synchronize_session=False)
+
+    free_user_ids = user_ids - premium_user_ids
+    if free_user_ids:
+        db.query(Users).filter(
+            Users.id.in_(free_user_ids),
+            Users.account_type == 1
+        ).update({"account_type": 0}, synchronize_session=False)
+
+
+subscription_reconciler = SubscriptionReconciler()
@@ -1,9 +1,12 @@
 import json
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from enum import Enum
 
@@ -94,6 +97,54 @@ class SubscriptionData:
         }
 
 
+ANDROID_PUBLISHER_SCOPES = ['https://www.googleapis.com/auth/androidpublisher']
+
+_credentials_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _get_discovery_document() -> str:
+    return get_static_doc('androidpublisher', 'v3')
+
+
+@lru_cache(maxsize=None)
+def _load_credentials(credentials_path: str) -> service_account.Credentials:
+    return service_account.Credentials.from_service_account_file(
+        credentials_path,
+        scopes=ANDROID_PUBLISHER_SCOPES
+    )
+
+
+def _get_credentials(credentials_path: str) -> service_account.Credentials:
+    with _credentials_lock:
+        return _load_credentials(credentials_path)
+
+
+def get_android_publisher(credentials_path: str):
+    """
+    Returns the Android Publisher client of the calling thread.
+
+    The credentials and the bundled discovery document are loaded once per
+    process. The client itself is built once per thread, because its httplib2
+    transport is not thread-safe; each thread then keeps reusing the same
+    client and its open connection.
+    """
+    services = getattr(_thread_local, 'services', None)
+    if services is None:
+        services = _thread_local.services = {}
+
+    service = services.get(credentials_path)
+    if service is None:
+        service = build_from_document(
+            _get_discovery_document(),
+            credentials=_get_credentials(credentials_path)
+        )
+        services[credentials_path] = service
+
+    return service
+
+
 class GooglePlaySubscriptionError(Exception):
     def __init__(self, message: str, original_error: Optional[Exception] = None):
         super().__init__(message)
@@ -118,16 +169,9 @@ class SubscriptionService:
 
     def __init__(self, credentials_path: str = 'play-console-validator.json'):
         self.credentials_path = credentials_path
-        self._service = None
     
     def _get_google_play_service(self):
-        if not self._service:
-            credentials = service_account.Credentials.from_service_account_file(
-                self.credentials_path,
-                scopes=['https://www.googleapis.com/auth/androidpublisher']
-            )
-            self._service = build('androidpublisher', 'v3', credentials=credentials)
-        return self._service
+        return get_android_publisher(self.credentials_path)
     
     def verify_subscription_with_google(self, package_name: str, purchase_token: str) -> Dict[str, Any]:
         try:
@@ -0,0 +1,195 @@
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+import tiktoken
+
+# The application modules read their configuration from the environment at
+# import time, so the test defaults are set before any of them is imported
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('DEFAULT_MODEL', 'gpt-4-turbo')
+os.environ.setdefault('MAX_TOKENS', '4000')
+
+from utils import utils
+
+_postgres_server = None
+
+
+def pytest_configure(config):
+    """
+    Points DATABASE_URL at TEST_DATABASE_URL or, when pgserver is installed,
+    at a throwaway local PostgreSQL. Without either the database tests skip.
+    """
+    global _postgres_server
+
+    if os.getenv('TEST_DATABASE_URL'):
+        os.environ['DATABASE_URL'] = os.environ['TEST_DATABASE_URL']
+        return
+
+    try:
+        import pgserver
+    except ImportError:
+        return
+
+    _postgres_server = pgserver.get_server(tempfile.mkdtemp(prefix='flashly-test-db-'), cleanup_mode='stop')
+    os.environ['DATABASE_URL'] = _postgres_server.get_uri()
+
+
+def pytest_unconfigure(config):
+    if _postgres_server is not None:
+        _postgres_server.cleanup()
+
+
+def _test_encoding() -> tiktoken.Encoding:
+    """
+    Byte-level BPE with a handful of merges. tiktoken downloads the real
+    encodings on first use, so the tests use this one to run offline; multibyte
+    characters are split across tokens, as rare ones are by the real encoders.
+    """
+    mergeable_ranks = {bytes([byte]): byte for byte in range(256)}
+    for merge in [b'a ', b'o ', b'e ', b'de', b'. ', b'\n\n', 'ão'.encode(), 'çã'.encode()[:3]]:
+        mergeable_ranks[merge] = len(mergeable_ranks)
+
+    return tiktoken.Encoding(
+        name='test',
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=mergeable_ranks,
+        special_tokens={}
+    )
+
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch) -> tiktoken.Encoding:
+    encoding = _test_encoding()
+    monkeypatch.setattr(utils, '_get_encoder', lambda: encoding)
+    return encoding
+
+
+@pytest.fixture(scope='session')
+def engine():
+    if not os.getenv('DATABASE_URL'):
+        pytest.skip('needs TEST_DATABASE_URL or pgserver')
+
+    import database
+    from models import (
+        flashcard_model, generation_job_model, play_notification_model, session_flashcards_model,
+        session_model, subject_model, subscription_model, survey_model, topic_model,
+        user_daily_usage_model, user_model
+    )
+
+    database.Base.metadata.drop_all(database.engine)
+    database.Base.metadata.create_all(database.engine)
+    return database.engine
+
+
+@pytest.fixture(scope='session')
+def truncate_tables(engine):
+    import database
+
+    def truncate() -> None:
+        tables = ', '.join(table.name for table in database.Base.metadata.sorted_tables)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'TRUNCATE {tables} CASCADE')
+
+    return truncate
+
+
+@pytest.fixture
+def db(engine, truncate_tables):
+    import database
+
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        truncate_tables()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """
+    TestClient for the app, signing and checking JWTs with a test secret.
+    """
+    monkeypatch.setenv('SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('ALGORITHM', 'HS256')
+
+    from fastapi.testclient import TestClient
+    from main import app
+
+    # Not used as a context manager, so the startup workers are not started
+    return TestClient(app)
+
+
+@pytest.fixture
+def count_statements(engine):
+    """
+    Context manager that collects the SQL statements run on the engine inside it.
+    """
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
+
+
+@pytest.fixture
+def seed_user(db):
+    """
+    Creates a user with the given number of subjects, each with topics_count
+    topics holding flashcards_count flashcards and one study session.
+    """
+    from models.flashcard_model import Flashcards
+    from models.session_model import Sessions
+    from models.subject_model import Subjects
+    from models.topic_model import Topics
+    from models.user_model import Users
+
+    def seed(subjects_count: int = 1, topics_count: int = 3, flashcards_count: int = 2):
+        user = Users(google_id=str(uuid.uuid4()), email=f'{uuid.uuid4()}@example.com', name='Aluno')
+        db.add(user)
+        db.flush()
+
+        for subject_number in range(subjects_count):
+            subject = Subjects(subject_name=f'Matéria {subject_number}', user_id=user.id)
+            db.add(subject)
+            db.flush()
+
+            for topic_number in range(topics_count):
+                topic = Topics(subject_id=subject.id, topic_name=f'Tópico {topic_number}')
+                db.add(topic)
+                db.flush()
+
+                db.add_all([
+                    Flashcards(
+                        user_id=user.id, subject_id=subject.id, topic_id=topic.id,
+                        question=f'Pergunta {number}', answer='Resposta', difficulty=1
+                    )
+                    for number in range(flashcards_count)
+                ])
+                db.add(Sessions(
+                    user_id=user.id, subject_id=str(subject.id), topic_id=topic.id, topic_name=topic.topic_name,
+                    correct_answer_count=1, incorrect_answer_count=1, total_questions=2,
+                    total_time_spent='00:01:30', easy_question_count=0, medium_question_count=2,
+                    hard_question_count=0
+                ))
+
+        db.commit()
+        return user
+
+    return seed
@@ -0,0 +1,47 @@
+from sqlalchemy import event
+
+from models.flashcard_model import Flashcards
+from models.subject_model import Subjects
+from models.topic_model import Topics
+from services.limit_service import LimitService
+from usecases.flashcards import FlashcardsUseCase
+
+
+def test_batch_of_flashcards_is_one_insert_and_one_commit(db, seed_user, count_statements):
+    user = seed_user(topics_count=1, flashcards_count=0)
+    topic = db.query(Topics).one()
+    use_case = FlashcardsUseCase(db=db, user_id=str(user.id), user=user)
+    flashcards_data = [
+        {
+            'subject_id': topic.subject_id, 'topic_id': topic.id, 'difficulty': number % 3,
+            'question': f'Pergunta {number}', 'answer': f'Resposta {number}'
+        }
+        for number in range(30)
+    ]
+
+    commits = []
+
+    def after_commit(session):
+        commits.append(session)
+
+    event.listen(db, 'after_commit', after_commit)
+    try:
+        with count_statements() as statements:
+            flashcards = use_case._create_flashcard_models(
+                flashcards_data, LimitService(db, user, Flashcards, Subjects)
+            )
+    finally:
+        event.remove(db, 'after_commit', after_commit)
+
+    flashcard_inserts = [statement for statement in statements if statement.startswith('INSERT INTO flashcards')]
+    flashcard_selects = [
+        statement for statement in statements
+        if statement.startswith('SELECT') and 'FROM flashcards' in statement
+    ]
+    assert len(flashcard_inserts) == 1
+    assert flashcard_selects == []
+    assert len(commits) == 1
+
+    assert [flashcard['question'] for flashcard in flashcards] == [data['question'] for data in flashcards_data]
+    assert all(flashcard['id'] for flashcard in flashcards)
+    assert db.query(Flashcards).count() == 30
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from test_fragments import PAGES, token_count
+from utils import utils
+
+
+MAX_TOKENS = 4000
+
+
+@pytest.fixture(autouse=True)
+def max_tokens(monkeypatch):
+    monkeypatch.setenv('MAX_TOKENS', str(MAX_TOKENS))
+
+
+def word_slicing_fragments(text_content):
+    """
+    The fragmenter that preceded iter_text_fragments: it counted the tokens once
+    and then sliced the words as if every word were a single token.
+    """
+    token_count = utils.token_counter(text_content)
+
+    if token_count <= MAX_TOKENS:
+        return [text_content]
+
+    num_parts = (token_count // MAX_TOKENS) + (1 if token_count % MAX_TOKENS else 0)
+    tokens_per_part = token_count // num_parts
+
+    words = text_content.split()
+    return [" ".join(words[i:i+tokens_per_part]) for i in range(0, len(words), tokens_per_part)]
+
+
+def timed(fragmenter, *args):
+    started = time.perf_counter()
+    fragments = list(fragmenter(*args))
+    return fragments, time.perf_counter() - started
+
+
+@pytest.mark.parametrize('page_count', [10, 100, 500])
+def test_token_fragmenter_against_word_slicing(encoder, page_count):
+    pages = [PAGES[number % len(PAGES)] for number in range(page_count)]
+    # Both fragmenters share the cached encoder, so only the fragmenting is timed
+    utils._get_encoder()
+
+    word_fragments, word_seconds = timed(word_slicing_fragments, ''.join(pages))
+    token_fragments, token_seconds = timed(utils.iter_text_fragments, pages)
+
+    word_sizes = [token_count(encoder, fragment) for fragment in word_fragments]
+    token_sizes = [token_count(encoder, fragment) for fragment in token_fragments]
+    print(
+        f'\n{page_count} pages: word slicing {word_seconds * 1000:.1f} ms, '
+        f'{len(word_fragments)} fragments, largest {max(word_sizes)} tokens; '
+        f'token fragmenter {token_seconds * 1000:.1f} ms, '
+        f'{len(token_fragments)} fragments, largest {max(token_sizes)} tokens'
+    )
+
+    assert max(token_sizes) <= MAX_TOKENS
+    assert sum(token_sizes) >= sum(word_sizes)
+    assert token_seconds < max(word_seconds * 20, 0.5)
@@ -0,0 +1,73 @@
+import pytest
+
+from utils.utils import _fragment_cut, iter_text_fragments
+
+
+MAX_TOKENS = 40
+
+PAGES = [
+    "A fotossíntese é o processo pelo qual as plantas convertem luz em energia química. "
+    "Ela ocorre nos cloroplastos, organelas que contêm clorofila.\n\n"
+    "Na fase clara, a água é quebrada e o oxigênio é liberado! Na fase escura, o ciclo de "
+    "Calvin fixa o carbono do ar em açúcares.",
+    "A respiração celular faz o caminho inverso: consome glicose e oxigênio (e libera CO₂). "
+    "Você já se perguntou por que as folhas mudam de cor no outono? Porque a clorofila se degrada.",
+    "Sem pontuação nenhuma este trecho segue e segue " * 6,
+    "çãõéêíóú🌱🌿🍃" * 30,
+]
+
+
+@pytest.fixture(autouse=True)
+def max_tokens(monkeypatch):
+    monkeypatch.setenv('MAX_TOKENS', str(MAX_TOKENS))
+
+
+def token_count(encoder, text):
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@pytest.mark.parametrize('texts', [
+    PAGES,
+    [''.join(PAGES)],
+    PAGES[-1:],
+    ["Curto."],
+])
+def test_fragments_fit_max_tokens_and_rejoin_to_the_input(encoder, texts):
+    fragments = list(iter_text_fragments(texts))
+
+    assert fragments
+    assert all(token_count(encoder, fragment) <= MAX_TOKENS for fragment in fragments)
+    assert ''.join(fragments) == ''.join(texts)
+
+
+def test_no_fragments_for_empty_input():
+    assert list(iter_text_fragments([])) == []
+    assert list(iter_text_fragments(['', ''])) == []
+
+
+def test_fragment_cut_prefers_a_paragraph_break():
+    token_bytes = [b'Primeira frase. ', b'Segunda frase.', b'\n\n', b'Outro par', b'agrafo']
+
+    assert _fragment_cut(token_bytes) == 3
+
+
+def test_fragment_cut_falls_back_to_a_sentence_end():
+    token_bytes = [b'Uma frase longa ', b'termina aqui. ', b'Outra ', b'comeca']
+
+    assert _fragment_cut(token_bytes) == 2
+
+
+def test_fragment_cut_ignores_breaks_in_the_first_half():
+    token_bytes = [b'Oi.\n\n', b'um texto bem mais longo ', b'sem quebra ', b'nenhuma']
+
+    assert _fragment_cut(token_bytes) == len(token_bytes)
+
+
+def test_fragment_cut_does_not_split_a_utf8_character():
+    encoded = 'ação'.encode()
+    token_bytes = [b'texto sem quebras ', encoded[:2], encoded[2:3], encoded[3:4]]
+
+    cut = _fragment_cut(token_bytes)
+
+    assert cut == 3
+    assert b''.join(token_bytes[:cut]).decode('utf-8') == 'texto sem quebras aç'
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+from models.generation_job_model import GenerationJobs
+from models.topic_model import Topics
+
+
+@pytest.fixture
+def user(seed_user):
+    return seed_user(subjects_count=1, topics_count=1, flashcards_count=0)
+
+
+@pytest.fixture
+def headers(user):
+    token = jwt.encode(
+        {'sub': user.email, 'id': str(user.id), 'exp': datetime.now(timezone.utc) + timedelta(minutes=5)},
+        'test-secret',
+        algorithm='HS256'
+    )
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_generation_job_is_returned_to_its_owner(client, db, user, headers):
+    topic = db.query(Topics).one()
+    job = GenerationJobs(
+        user_id=user.id, subject_id=topic.subject_id, topic_id=topic.id,
+        quantity=10, difficulty=1, status='pending', file_content=b'%PDF-1.4'
+    )
+    db.add(job)
+    db.commit()
+
+    response = client.get(f'/flashcards/jobs/{job.id}', headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()['id'] == str(job.id)
+
+
+@pytest.mark.parametrize('job_id, expected_status', [
+    (str(uuid.uuid4()), 404),
+    ('not-a-uuid', 422),
+])
+def test_unknown_or_malformed_job_ids(client, headers, job_id, expected_status):
+    response = client.get(f'/flashcards/jobs/{job_id}', headers=headers)
+
+    assert response.status_code == expected_status, response.text
@@ -0,0 +1,210 @@
+import io
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from core.openai import client as openai_client
+from services.generation_service import FlashcardGenerationService
+from utils import utils
+from utils.pdf_cache import PdfTextCache
+
+
+class FakeCompletions:
+    """
+    Stands in for client.chat.completions: answers each call with the number
+    of flashcards asked for in the system prompt (plus `extra`), taking the
+    questions from `questions` when given and from the fragment otherwise.
+    Each call takes `delay` seconds, standing for the round-trip to the API.
+    """
+
+    def __init__(self, extra=0, questions=None, delay=0):
+        self.extra = extra
+        self.questions = questions
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, **kwargs):
+        system_prompt, fragment = messages[0]['content'], messages[1]['content']
+        quantity = int(re.search(r'gerar (\d+) ótimos flashcards', system_prompt).group(1))
+
+        with self._lock:
+            self.calls.append((fragment, quantity))
+        time.sleep(self.delay)
+
+        count = quantity + self.extra
+        questions = self.questions or [f'{fragment} pergunta {number}' for number in range(count)]
+        content = json.dumps({'flashcards': [
+            {'question': question, 'answer': 'resposta'} for question in questions[:count]
+        ]})
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    completions = FakeCompletions()
+    monkeypatch.setattr(openai_client, 'client', SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def requested(completions):
+    return dict(sorted(completions.calls))
+
+
+def test_quantity_is_split_across_the_fragments(completions):
+    fragments = ['f0', 'f1', 'f2', 'f3']
+
+    flashcards = FlashcardGenerationService(max_workers=2).generate(fragments, 10)
+
+    assert requested(completions) == {'f0': 2, 'f1': 3, 'f2': 2, 'f3': 3}
+    assert len(flashcards) == 10
+    assert [flashcard['question'] for flashcard in flashcards[:2]] == ['f0 pergunta 0', 'f0 pergunta 1']
+
+
+@pytest.mark.parametrize('quantity, expected_requests', [
+    (3, {'f3': 1, 'f6': 1, 'f9': 1}),
+    (5, {'f1': 1, 'f3': 1, 'f5': 1, 'f7': 1, 'f9': 1}),
+])
+def test_a_quantity_below_the_fragment_count_is_spread_over_the_document(completions, quantity, expected_requests):
+    fragments = [f'f{number}' for number in range(10)]
+
+    flashcards = FlashcardGenerationService().generate(fragments, quantity)
+
+    assert requested(completions) == expected_requests
+    assert len(flashcards) == quantity
+
+
+def test_an_overestimated_fragment_count_leaves_the_rest_to_the_last_fragment(completions):
+    flashcards = FlashcardGenerationService().generate(['f0', 'f1'], 3, expected_fragments=5)
+
+    assert requested(completions) == {'f1': 3}
+    assert len(flashcards) == 3
+
+
+def test_fragments_are_generated_concurrently(completions):
+    fragments = ['f0', 'f1', 'f2', 'f3']
+    completions.delay = round_trip = 0.2
+
+    started = time.perf_counter()
+    concurrent = FlashcardGenerationService(max_workers=len(fragments)).generate(fragments, 8)
+    concurrent_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    serial = FlashcardGenerationService(max_workers=1).generate(fragments, 8)
+    serial_seconds = time.perf_counter() - started
+
+    assert len(concurrent) == len(serial) == 8
+    assert round_trip <= concurrent_seconds < 2 * round_trip
+    assert serial_seconds >= len(fragments) * round_trip
+
+
+def test_repeated_questions_are_dropped_across_fragments(completions):
+    # Every fragment is in flight at once, so none of them sees the others'
+    # questions in its history and all answer the same
+    completions.questions = ['O que é DNA?', 'o que é   dna', 'O que é RNA?']
+
+    flashcards = FlashcardGenerationService(max_workers=3).generate(['f0', 'f1', 'f2'], 9)
+
+    assert len(completions.calls) == 3
+    assert [flashcard['question'] for flashcard in flashcards] == ['O que é DNA?', 'O que é RNA?']
+
+
+def test_generated_flashcards_are_capped_at_the_quantity(completions):
+    completions.extra = 5
+
+    flashcards = FlashcardGenerationService().generate(['f0', 'f1', 'f2'], 7)
+
+    assert sum(requested(completions).values()) == 7
+    assert len(flashcards) == 7
+
+
+def test_no_calls_without_quantity(completions):
+    assert FlashcardGenerationService().generate(['f0', 'f1'], 0) == []
+    assert completions.calls == []
+
+
+def make_pdf(pages):
+    """
+    Builds a minimal PDF with one line of Helvetica text per page.
+    """
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in pages:
+        content = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream')
+        objects.append(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>'
+        )
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    data, offsets = b'%PDF-1.4\n', []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f'{number} 0 obj\n{body}\nendobj\n'.encode()
+
+    xref = len(data)
+    data += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    data += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    data += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return data
+
+
+def test_a_low_fragment_estimate_still_reaches_the_end_of_the_pdf(completions, monkeypatch, tmp_path):
+    monkeypatch.setenv('MAX_TOKENS', '500')
+    monkeypatch.setattr(utils, 'pdf_text_cache', PdfTextCache(cache_dir=str(tmp_path)))
+
+    data = make_pdf([
+        ''.join(f'Frase {sentence} da pagina {page}. ' for sentence in range(60))
+        for page in range(3)
+    ])
+
+    fragments, expected_fragments = utils.stream_pdf_fragments(io.BytesIO(data))
+    flashcards = FlashcardGenerationService(max_workers=2).generate(fragments, 20, expected_fragments)
+
+    assert len(flashcards) == 20
+    assert any('pagina 2' in fragment for fragment, _ in completions.calls)
+
+    # The stream was read to the end, so the text is cached and the second
+    # upload is fragmented from it, with an exact count
+    cached_fragments, cached_count = utils.stream_pdf_fragments(io.BytesIO(data))
+    assert utils.pdf_text_cache.hits == 1
+    assert len(list(cached_fragments)) == cached_count > expected_fragments
+
+
+class InlineExtractionPool:
+    """
+    Stands in for the extraction process pool: runs each page range in the
+    calling process and records the ranges submitted.
+    """
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, path, start, end):
+        self.submitted.append((start, end))
+        future = Future()
+        future.set_result(function(path, start, end))
+        return future
+
+
+def test_parallel_extraction_keeps_one_range_per_worker_in_flight(monkeypatch):
+    pool = InlineExtractionPool()
+    monkeypatch.setattr(utils, '_get_extraction_pool', lambda: pool)
+    monkeypatch.setattr(utils, '_extraction_workers', 2)
+    data = make_pdf([f'pagina {number}' for number in range(40)])
+
+    texts = utils._extract_pages_parallel(data, 40)
+
+    assert next(texts) == ''.join(f'pagina {number}' for number in range(10))
+    assert pool.submitted == [(0, 10), (10, 20)]
+
+    assert ''.join(texts) == ''.join(f'pagina {number}' for number in range(10, 40))
+    assert pool.submitted == [(0, 10), (10, 20), (20, 30), (30, 40)]
@@ -0,0 +1,48 @@
+from models.flashcard_model import Flashcards
+from models.generation_job_model import GenerationJobs
+from models.session_model import Sessions
+from models.subject_model import Subjects
+from models.topic_model import Topics
+from models.user_daily_usage_model import UserDailyUsage
+from models.user_model import Users
+from services.limit_service import LimitService
+from usecases.topics import TopicUseCase
+from usecases.user import UserUseCase
+
+
+def add_generation_job(db, user, topic) -> GenerationJobs:
+    job = GenerationJobs(
+        user_id=user.id, subject_id=topic.subject_id, topic_id=topic.id,
+        quantity=10, difficulty=1, status='pending', file_content=b'%PDF-1.4'
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_deleting_a_topic_deletes_its_generation_jobs(db, seed_user):
+    user = seed_user(subjects_count=1, topics_count=2)
+    kept_topic, deleted_topic = db.query(Topics).join(Subjects).filter(Subjects.user_id == user.id).all()
+    kept_job = add_generation_job(db, user, kept_topic)
+    add_generation_job(db, user, deleted_topic)
+    # Only the generation jobs are under test; sessions still block the delete
+    db.query(Sessions).filter(Sessions.topic_id == deleted_topic.id).delete()
+    db.commit()
+
+    TopicUseCase(db=db, topic_id=deleted_topic.id).delete_topic()
+
+    assert [job.id for job in db.query(GenerationJobs).all()] == [kept_job.id]
+
+
+def test_deleting_a_user_deletes_its_jobs_and_daily_usage(db, seed_user):
+    user = seed_user(subjects_count=1, topics_count=1)
+    topic = db.query(Topics).join(Subjects).filter(Subjects.user_id == user.id).one()
+    add_generation_job(db, user, topic)
+    LimitService(db, user, Flashcards, Subjects).reserve_flashcards(origin='ai', quantity=3)
+    db.commit()
+
+    UserUseCase(db, user=user).delete_user_usecase(user_id=user.id)
+
+    assert db.query(Users).count() == 0
+    assert db.query(GenerationJobs).count() == 0
+    assert db.query(UserDailyUsage).count() == 0
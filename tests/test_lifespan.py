@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+
+def test_background_workers_run_for_the_lifetime_of_the_app(engine, monkeypatch):
+    import main
+
+    events = []
+    monkeypatch.setattr(main.generation_job_queue, 'start', lambda handler: events.append('queue started'))
+    monkeypatch.setattr(main.generation_job_queue, 'stop', lambda: events.append('queue stopped'))
+    monkeypatch.setattr(main.subscription_reconciler, 'start', lambda: events.append('reconciler started'))
+    monkeypatch.setattr(main.subscription_reconciler, 'stop', lambda: events.append('reconciler stopped'))
+
+    with TestClient(main.app):
+        assert events == ['queue started', 'reconciler started']
+
+    assert events == ['queue started', 'reconciler started', 'reconciler stopped', 'queue stopped']
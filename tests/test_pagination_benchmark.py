@@ -0,0 +1,120 @@
+import statistics
+import time
+
+import pytest
+
+from models.flashcard_model import Flashcards
+from models.user_model import Users
+from usecases.flashcards import FlashcardsUseCase
+from utils.pagination import encode_cursor, paginate
+
+
+ROWS = 100_000
+PAGE_SIZE = 20
+
+LARGE_TOPIC_SQL = f"""
+    INSERT INTO users (id, google_id, email, account_type, is_admin, credits)
+    VALUES (gen_random_uuid(), 'large-topic', 'large-topic@example.com', 1, false, 0);
+
+    INSERT INTO subjects (id, subject_name, user_id, created_at)
+    SELECT gen_random_uuid(), 'Matéria', users.id, now()
+    FROM users WHERE google_id = 'large-topic';
+
+    INSERT INTO topics (id, subject_id, topic_name, created_at)
+    SELECT gen_random_uuid(), subjects.id, 'Tópico', now()
+    FROM subjects;
+
+    INSERT INTO flashcards (id, user_id, subject_id, topic_id, question, answer, difficulty, origin, created_at)
+    SELECT gen_random_uuid(), subjects.user_id, subjects.id, topics.id, 'Pergunta ' || n, 'Resposta', mod(n, 3),
+        CASE WHEN mod(n, 3) = 0 THEN 'ai' ELSE 'user' END, now() - n * interval '1 second'
+    FROM topics JOIN subjects ON subjects.id = topics.subject_id, generate_series(1, {ROWS}) AS n;
+
+    ANALYZE users, subjects, topics, flashcards;
+"""
+
+
+@pytest.fixture(scope='module')
+def large_topic(engine, truncate_tables):
+    """
+    One topic holding ROWS flashcards, inserted in bulk.
+    """
+    import database
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(LARGE_TOPIC_SQL)
+
+    session = database.SessionLocal()
+    try:
+        user = session.query(Users).filter(Users.google_id == 'large-topic').one()
+        topic_id = session.query(Flashcards.topic_id).filter(Flashcards.user_id == user.id).first()[0]
+        yield session, user, topic_id
+    finally:
+        session.close()
+        truncate_tables()
+
+
+def median_seconds(run, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def test_cursor_pages_stay_flat_where_offset_pages_grow(large_topic):
+    db, user, topic_id = large_topic
+    query = FlashcardsUseCase(db=db, user_id=user.id, user=user)._flashcards_query(topic_id, user.id, None, None)
+
+    timings = {}
+    for depth in (0, ROWS // 2, ROWS - PAGE_SIZE):
+        if depth:
+            previous = query.order_by(Flashcards.created_at, Flashcards.id).offset(depth - 1).first()
+            cursor = encode_cursor(previous.created_at, previous.id)
+        else:
+            cursor = ''
+
+        (offset_page, _), offset_seconds = median_seconds(lambda: paginate(query, Flashcards, PAGE_SIZE, depth))
+        (cursor_page, _), cursor_seconds = median_seconds(lambda: paginate(query, Flashcards, PAGE_SIZE, cursor=cursor))
+        db.rollback()
+
+        assert [row.id for row in cursor_page] == [row.id for row in offset_page]
+        timings[depth] = offset_seconds, cursor_seconds
+        print(f'\nrow {depth}: OFFSET {offset_seconds * 1000:.1f} ms, cursor {cursor_seconds * 1000:.1f} ms')
+
+    first_offset, first_cursor = timings[0]
+    deepest_offset, deepest_cursor = timings[ROWS - PAGE_SIZE]
+    assert deepest_cursor < deepest_offset / 5
+    assert deepest_cursor < first_cursor * 3 + 0.005
+    assert deepest_offset > first_offset * 5
+
+
+def test_total_count_strategies(large_topic):
+    db, user, topic_id = large_topic
+    usecase = FlashcardsUseCase(db=db, user_id=user.id, user=user)
+
+    def count_then_page(offset):
+        # What retrieve_all_flashcards did before the window count
+        query = usecase._flashcards_query(topic_id, user.id, None, None)
+        flashcards, _ = paginate(query, Flashcards, PAGE_SIZE, offset)
+        return [flashcard.to_dict() for flashcard in flashcards], query.count(), None
+
+    strategies = {
+        'count() + page': count_then_page,
+        'COUNT(*) OVER()': lambda offset: usecase.retrieve_all_flashcards(topic_id, user.id, PAGE_SIZE, offset),
+        'include_count=False': lambda offset: usecase.retrieve_all_flashcards(
+            topic_id, user.id, PAGE_SIZE, offset, include_count=False
+        ),
+    }
+
+    for offset in (0, ROWS - PAGE_SIZE):
+        timings, results = {}, {}
+        for name, strategy in strategies.items():
+            results[name], timings[name] = median_seconds(lambda: strategy(offset))
+            db.rollback()
+        print(f'\nrow {offset}: ' + ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in timings.items()))
+
+        pages = [[flashcard['id'] for flashcard in page] for page, _, _ in results.values()]
+        assert pages[0] == pages[1] == pages[2]
+        assert [total for _, total, _ in results.values()] == [ROWS, ROWS, None]
+        assert timings['include_count=False'] < timings['count() + page']
@@ -0,0 +1,50 @@
+import io
+import os
+import time
+
+import PyPDF2
+import pytest
+
+from test_generation_service import make_pdf
+from utils import utils
+
+
+def extract_serial(data):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [page.extract_text() for page in reader.pages]
+
+
+def extract_parallel(data):
+    page_count = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+    return list(utils._extract_pages_parallel(data, page_count))
+
+
+def timed(extract, data):
+    started = time.perf_counter()
+    texts = extract(data)
+    return ''.join(texts), time.perf_counter() - started
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm_pool():
+    # Spawning the workers is paid once per process, not per document
+    utils._get_extraction_pool()
+    list(utils._extract_pages_parallel(make_pdf(['aquecimento'] * 2), 2))
+
+
+@pytest.mark.parametrize('page_count', [10, 100, 500])
+def test_parallel_extraction_throughput(page_count):
+    sentence = 'A fotossintese converte energia luminosa em energia quimica. '
+    data = make_pdf([f'Pagina {number}. ' + sentence * 40 for number in range(page_count)])
+
+    serial_text, serial_seconds = timed(extract_serial, data)
+    parallel_text, parallel_seconds = timed(extract_parallel, data)
+
+    print(
+        f'\n{page_count} pages: serial {page_count / serial_seconds:.0f} pages/s, '
+        f'parallel {page_count / parallel_seconds:.0f} pages/s '
+        f'({utils._extraction_workers} workers)'
+    )
+    assert parallel_text == serial_text
+    if page_count == 500 and (os.cpu_count() or 1) >= 4:
+        assert parallel_seconds < serial_seconds
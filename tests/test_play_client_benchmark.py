@@ -0,0 +1,67 @@
+import json
+import statistics
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+from services.subscription_service import ANDROID_PUBLISHER_SCOPES, SubscriptionService
+
+
+@pytest.fixture
+def credentials_path(tmp_path):
+    """
+    A service-account file with a freshly generated key; building the client
+    never contacts Google, so the key does not need to be registered anywhere.
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    path = tmp_path / 'play-console-validator.json'
+    path.write_text(json.dumps({
+        'type': 'service_account',
+        'project_id': 'flashly-test',
+        'private_key_id': 'test-key',
+        'private_key': private_key.decode(),
+        'client_email': 'validator@flashly-test.iam.gserviceaccount.com',
+        'client_id': '1',
+        'token_uri': 'https://oauth2.googleapis.com/token',
+    }))
+    return str(path)
+
+
+def build_uncached(credentials_path):
+    # What every SubscriptionService did before the client was cached
+    credentials = service_account.Credentials.from_service_account_file(
+        credentials_path, scopes=ANDROID_PUBLISHER_SCOPES
+    )
+    return build('androidpublisher', 'v3', credentials=credentials)
+
+
+def median_seconds(run, repeat=10):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def test_play_client_is_built_once_per_thread(credentials_path):
+    started = time.perf_counter()
+    first_service = SubscriptionService(credentials_path)._get_google_play_service()
+    first_seconds = time.perf_counter() - started
+
+    uncached_seconds = median_seconds(lambda: build_uncached(credentials_path))
+    cached_seconds = median_seconds(lambda: SubscriptionService(credentials_path)._get_google_play_service())
+
+    print(
+        f'\nuncached {uncached_seconds * 1000:.1f} ms per service, '
+        f'first cached build {first_seconds * 1000:.1f} ms, '
+        f'later services {cached_seconds * 1000:.3f} ms'
+    )
+    assert SubscriptionService(credentials_path)._get_google_play_service() is first_service
+    assert cached_seconds < uncached_seconds / 100
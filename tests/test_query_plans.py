@@ -0,0 +1,187 @@
+import json
+from typing import Dict, List, Set, Tuple
+
+import pytest
+from sqlalchemy import event
+
+from models.flashcard_model import Flashcards
+from models.subject_model import Subjects
+from models.user_model import Users
+from services.limit_service import LimitService
+from usecases.flashcards import FlashcardsUseCase
+from usecases.subjects import SubjectsUseCase
+from usecases.topics import TopicUseCase
+
+
+@pytest.fixture
+def capture_queries(engine):
+    """
+    Runs a callable and returns the SELECT statements it issued, each with
+    its bound parameters, so they can be explained afterwards.
+    """
+    def capture(run) -> List[Tuple[str, Dict]]:
+        queries = []
+
+        def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                queries.append((statement, parameters))
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            run()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        return queries
+
+    return capture
+
+
+def scans(engine, statement: str, parameters) -> Dict[str, Set[str]]:
+    """
+    Maps each table in the plan of the statement to how it is read: the index
+    names it is scanned through, or 'Seq Scan'.
+
+    Sequential scans are priced out so that the plan shows whether an index
+    can serve the predicates at all; a table that still gets a Seq Scan has no
+    usable index for them.
+    """
+    with engine.connect() as connection:
+        connection.exec_driver_sql('SET enable_seqscan = off')
+        (plan,), = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).fetchall()
+        connection.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    table_scans: Dict[str, Set[str]] = {}
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+
+        if node['Node Type'] == 'Bitmap Heap Scan':
+            # The indexes are in the Bitmap Index Scan nodes below it
+            bitmap_nodes = list(node.get('Plans', []))
+            while bitmap_nodes:
+                bitmap_node = bitmap_nodes.pop()
+                bitmap_nodes.extend(bitmap_node.get('Plans', []))
+                if 'Index Name' in bitmap_node:
+                    table_scans.setdefault(node['Relation Name'], set()).add(bitmap_node['Index Name'])
+            continue
+
+        nodes.extend(node.get('Plans', []))
+        if 'Relation Name' in node:
+            table_scans.setdefault(node['Relation Name'], set()).add(node.get('Index Name', node['Node Type']))
+
+    return table_scans
+
+
+def assert_index_scans(engine, queries, allowed_indexes: Dict[str, Set[str]]) -> None:
+    """
+    Explains every query and checks that each table is read only through the
+    allowed indexes (any of them, as the planner may pick between indexes
+    that serve the same predicates equally well).
+    """
+    table_scans: Dict[str, Set[str]] = {}
+    for statement, parameters in queries:
+        for table, used in scans(engine, statement, parameters).items():
+            table_scans.setdefault(table, set()).update(used)
+
+    assert table_scans.keys() == allowed_indexes.keys()
+    for table, used in table_scans.items():
+        assert used <= allowed_indexes[table], f'{table} read through {used}'
+
+
+BACKGROUND_SQL = """
+    INSERT INTO users (id, google_id, email, account_type, is_admin, credits)
+    SELECT gen_random_uuid(), 'background-' || n, 'background-' || n || '@example.com', 0, false, 0
+    FROM generate_series(1, 200) AS n;
+
+    INSERT INTO subjects (id, subject_name, user_id, created_at)
+    SELECT gen_random_uuid(), 'Matéria ' || n, users.id, now() - n * interval '1 day'
+    FROM users, generate_series(1, 2) AS n;
+
+    INSERT INTO topics (id, subject_id, topic_name, created_at)
+    SELECT gen_random_uuid(), subjects.id, 'Tópico ' || n, now()
+    FROM subjects, generate_series(1, 5) AS n;
+
+    INSERT INTO flashcards (id, user_id, subject_id, topic_id, question, answer, difficulty, origin, created_at, deleted_at)
+    SELECT gen_random_uuid(), subjects.user_id, subjects.id, topics.id, 'Pergunta ' || n, 'Resposta', 1,
+        CASE WHEN mod(n, 3) = 0 THEN 'ai' ELSE 'user' END, now() - n * interval '1 hour',
+        CASE WHEN mod(n, 10) = 0 THEN now() END
+    FROM topics JOIN subjects ON subjects.id = topics.subject_id, generate_series(1, 20) AS n;
+
+    INSERT INTO sessions (
+        id, user_id, subject_id, topic_id, topic_name, correct_answer_count, incorrect_answer_count,
+        total_questions, total_time_spent, duration_seconds, easy_question_count, medium_question_count,
+        hard_question_count, created_at
+    )
+    SELECT gen_random_uuid(), subjects.user_id, subjects.id::text, topics.id, topics.topic_name, 3, 1, 4,
+        '00:02:00', 120, 1, 2, 1, now() - n * interval '1 day'
+    FROM topics JOIN subjects ON subjects.id = topics.subject_id, generate_series(1, 3) AS n;
+
+    ANALYZE users, subjects, topics, flashcards, sessions;
+"""
+
+
+@pytest.fixture(scope='module')
+def seeded_db(engine, truncate_tables):
+    """
+    A couple hundred users with subjects, topics, flashcards and sessions,
+    inserted in bulk so the planner sees realistic selectivities.
+    """
+    import database
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(BACKGROUND_SQL)
+
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        truncate_tables()
+
+
+@pytest.fixture
+def user(seeded_db) -> Users:
+    return seeded_db.query(Users).filter(Users.google_id == 'background-1').one()
+
+
+def test_flashcards_listing_uses_the_user_topic_index(seeded_db, engine, user, capture_queries):
+    topic_id = seeded_db.query(Flashcards.topic_id).filter(Flashcards.user_id == user.id).first()[0]
+    usecase = FlashcardsUseCase(db=seeded_db, user_id=user.id, user=user)
+
+    queries = capture_queries(lambda: usecase.retrieve_all_flashcards(topic_id=topic_id, user_id=user.id))
+
+    assert_index_scans(engine, queries, {'flashcards': {'ix_flashcards_user_id_topic_id_created_at'}})
+
+
+def test_subject_statistics_use_the_user_indexes(seeded_db, engine, user, capture_queries):
+    usecase = SubjectsUseCase(db=seeded_db, user_id=user.id, user=user)
+
+    assert_index_scans(engine, capture_queries(usecase._get_statistics), {
+        'flashcards': {'ix_flashcards_user_id_created_at', 'ix_flashcards_user_id_topic_id_created_at'},
+        'sessions': {'ix_sessions_user_id_created_at'},
+        'subjects': {'ix_subjects_user_id_created_at'},
+        'topics': {'ix_topics_subject_id'},
+    })
+
+
+def test_topics_listing_uses_the_topic_indexes(seeded_db, engine, user, capture_queries):
+    subject_id = seeded_db.query(Subjects.id).filter(Subjects.user_id == user.id).first()[0]
+    usecase = TopicUseCase(db=seeded_db, subject_id=subject_id)
+
+    assert_index_scans(engine, capture_queries(usecase.retrieve_all_topics), {
+        'topics': {'ix_topics_subject_id'},
+        'flashcards': {'ix_flashcards_topic_id'},
+        'sessions': {'ix_sessions_topic_id_created_at'},
+    })
+
+
+def test_daily_usage_is_a_primary_key_lookup(seeded_db, engine, user, capture_queries):
+    limit_service = LimitService(seeded_db, user, Flashcards, Subjects)
+
+    assert_index_scans(engine, capture_queries(limit_service.get_usage), {
+        'user_daily_usage': {'user_daily_usage_pkey'}
+    })
@@ -0,0 +1,76 @@
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+from models.subject_model import Subjects
+from models.topic_model import Topics
+
+
+@pytest.fixture
+def user(db, seed_user):
+    user = seed_user(subjects_count=1, topics_count=1)
+    user.is_admin = True
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def topic(db, user):
+    return db.query(Topics).join(Subjects, Topics.subject_id == Subjects.id).filter(Subjects.user_id == user.id).one()
+
+
+@pytest.fixture
+def headers(user):
+    token = jwt.encode(
+        {'sub': user.email, 'id': str(user.id), 'exp': datetime.now(timezone.utc) + timedelta(minutes=5)},
+        'test-secret',
+        algorithm='HS256'
+    )
+    return {'Authorization': f'Bearer {token}'}
+
+
+def users_selects(statements):
+    return [
+        statement for statement in statements
+        if statement.lstrip().upper().startswith('SELECT') and re.search(r'\bFROM users\b', statement)
+    ]
+
+
+def flashcard_payload(topic, number=0):
+    return {
+        'subject_id': str(topic.subject_id),
+        'topic_id': str(topic.id),
+        'question': f'Pergunta nova {number}',
+        'answer': 'Resposta',
+        'difficulty': 1
+    }
+
+
+def survey_payload():
+    now = datetime.now(timezone.utc)
+    return {
+        'title': 'Próxima matéria',
+        'start_date': now.isoformat(),
+        'end_date': (now + timedelta(days=7)).isoformat(),
+        'options': [{'title': 'Física'}, {'title': 'Química'}]
+    }
+
+
+@pytest.mark.parametrize('method, path, request_kwargs, expected_status', [
+    ('post', '/flashcards', lambda topic: {'data': {'flashcard': json.dumps(flashcard_payload(topic))}}, 201),
+    ('post', '/flashcards/bulk', lambda topic: {'json': {'data': [flashcard_payload(topic, n) for n in range(3)]}}, 201),
+    ('post', '/subjects', lambda topic: {'json': {'subject_name': 'Química'}}, 201),
+    ('get', '/users', lambda topic: {}, 200),
+    ('post', '/surveys', lambda topic: {'json': survey_payload()}, 201),
+])
+def test_endpoint_loads_the_user_once(
+    client, headers, topic, count_statements, method, path, request_kwargs, expected_status
+):
+    with count_statements() as statements:
+        response = getattr(client, method)(path, headers=headers, **request_kwargs(topic))
+
+    assert response.status_code == expected_status, response.text
+    assert len(users_selects(statements)) == 1
@@ -0,0 +1,132 @@
+import base64
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from models.play_notification_model import PlayNotifications
+from models.subscription_model import SubscriptionModel
+from models.user_model import Users
+from services.subscription_service import SubscriptionService
+
+
+PAYLOADS = Path(__file__).parent / 'payloads'
+NEW_TOKEN = 'new-purchase-token.AO-J1OxQm3Xy0vH1'
+OLD_TOKEN = 'old-purchase-token.AO-J1OzK8r2Lm7Qa'
+
+
+def load_payload(name: str) -> dict:
+    return json.loads((PAYLOADS / name).read_text())
+
+
+def push_envelope(notification, message_id: str = None) -> dict:
+    envelope = load_payload('rtdn_push_envelope.json')
+    envelope['message']['data'] = base64.b64encode(json.dumps(notification).encode()).decode()
+    if message_id:
+        envelope['message']['messageId'] = envelope['message']['message_id'] = message_id
+    return envelope
+
+
+@pytest.fixture
+def google_lookups(monkeypatch):
+    """
+    Answers subscriptionsv2.get with the recorded response, moved so that it
+    expires a month from now, and records the tokens looked up.
+    """
+    response = load_payload('subscriptionsv2_active.json')
+    response['lineItems'][0]['expiryTime'] = (
+        datetime.now(timezone.utc) + timedelta(days=30)
+    ).isoformat().replace('+00:00', 'Z')
+
+    lookups = []
+
+    def verify_subscription_with_google(self, package_name, purchase_token):
+        lookups.append(purchase_token)
+        return copy.deepcopy(response)
+
+    monkeypatch.setattr(SubscriptionService, 'verify_subscription_with_google', verify_subscription_with_google)
+    return lookups
+
+
+@pytest.fixture
+def replay(client, monkeypatch):
+    monkeypatch.setenv('RTDN_PUSH_TOKEN', 'push-secret')
+
+    def post(envelope: dict) -> dict:
+        response = client.post('/subscriptions/rtdn', params={'token': 'push-secret'}, json=envelope)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return post
+
+
+@pytest.fixture
+def subscriber(db, seed_user):
+    return seed_user(subjects_count=0)
+
+
+def add_subscription(db, user: Users, purchase_token: str) -> SubscriptionModel:
+    now = datetime.now(timezone.utc)
+    subscription = SubscriptionModel(
+        user_id=user.id,
+        package_name='com.flashly.app',
+        purchase_token=purchase_token,
+        product_id='flashly_premium',
+        start_date=now - timedelta(days=30),
+        expiration_date=now - timedelta(minutes=5),
+        subscription_state='SUBSCRIPTION_STATE_ACTIVE',
+        is_active=True
+    )
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+
+def test_redelivered_message_is_applied_once(db, replay, google_lookups, subscriber):
+    add_subscription(db, subscriber, NEW_TOKEN)
+    envelope = push_envelope(load_payload('rtdn_subscription_notification.json'))
+
+    assert replay(envelope) == {'status': 'processed', 'is_active': True}
+    assert replay(envelope) == {'status': 'duplicate'}
+
+    assert google_lookups == [NEW_TOKEN]
+    assert db.query(PlayNotifications).count() == 1
+
+    db.expire_all()
+    assert db.get(Users, subscriber.id).account_type == 1
+
+
+def test_unknown_token_is_recorded_and_acknowledged(db, replay, google_lookups):
+    envelope = push_envelope(load_payload('rtdn_subscription_notification.json'))
+
+    assert replay(envelope) == {'status': 'unknown_subscription'}
+
+    notification = db.query(PlayNotifications).one()
+    assert (notification.purchase_token, notification.notification_type) == (NEW_TOKEN, 2)
+    assert db.query(SubscriptionModel).count() == 0
+
+
+def test_linked_purchase_token_moves_the_subscription(db, replay, google_lookups, subscriber):
+    subscription = add_subscription(db, subscriber, OLD_TOKEN)
+    envelope = push_envelope(load_payload('rtdn_subscription_notification.json'))
+
+    assert replay(envelope) == {'status': 'processed', 'is_active': True}
+
+    db.expire_all()
+    moved = db.query(SubscriptionModel).one()
+    assert moved.id == subscription.id
+    assert moved.purchase_token == NEW_TOKEN
+    assert moved.expiration_date > datetime.now(timezone.utc) + timedelta(days=29)
+    assert (moved.currency_code, moved.price_nanos) == ('BRL', 900000000)
+    assert db.get(Users, subscriber.id).account_type == 1
+
+
+@pytest.mark.parametrize('notification', ['"texto"', '[1, 2]', 'null'])
+def test_notification_that_is_not_an_object_is_acknowledged(db, replay, google_lookups, notification):
+    envelope = push_envelope(None)
+    envelope['message']['data'] = base64.b64encode(notification.encode()).decode()
+
+    assert replay(envelope) == {'status': 'invalid'}
+    assert google_lookups == []
@@ -0,0 +1,38 @@
+from models.user_model import Users
+from usecases.subjects import SubjectsUseCase
+
+
+def list_subjects(db, user: Users, count_statements):
+    usecase = SubjectsUseCase(db=db, user_id=user.id)
+
+    with count_statements() as statements:
+        subjects, _ = usecase.retrieve_all_subjects_usecase(limit=50, offset=0, search=None)
+
+    return subjects, statements
+
+
+def test_subjects_listing_runs_a_fixed_number_of_queries(db, seed_user, count_statements):
+    few_user = seed_user(subjects_count=2)
+    many_user = seed_user(subjects_count=12)
+
+    few_subjects, few_statements = list_subjects(db, few_user, count_statements)
+    many_subjects, many_statements = list_subjects(db, many_user, count_statements)
+
+    assert len(few_subjects) == 2
+    assert len(many_subjects) == 12
+    assert len(many_statements) == len(few_statements)
+
+
+def test_subjects_listing_aggregates(db, seed_user, count_statements):
+    user = seed_user(subjects_count=2)
+
+    subjects, _ = list_subjects(db, user, count_statements)
+
+    assert [len(subject['topics']) for subject in subjects] == [3, 3]
+    assert all(topic['count'] == 2 for subject in subjects for topic in subject['topics'])
+    assert subjects[0]['statistics'] == {
+        'total_cards': 12,
+        'time_spend': '00h 09m',
+        'accuracy': 50.0,
+        'topics_count': 6
+    }
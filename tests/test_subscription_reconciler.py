@@ -0,0 +1,123 @@
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import database
+from models.subscription_model import SubscriptionModel
+from models.user_model import Users
+from services.subscription_reconciler import SubscriptionReconciler
+from services.subscription_service import GooglePlaySubscriptionError, SubscriptionService
+
+
+RECORDED_RESPONSE = json.loads((Path(__file__).parent / 'payloads' / 'subscriptionsv2_active.json').read_text())
+
+
+def google_time(moment: datetime) -> str:
+    return moment.isoformat().replace('+00:00', 'Z')
+
+
+class FakePlaySubscriptionService(SubscriptionService):
+    """
+    SubscriptionService whose subscriptionsv2.get answers from a table of
+    purchase token -> response (or error), parsed by the real service code.
+    """
+
+    def __init__(self, responses: dict):
+        super().__init__()
+        self.responses = responses
+        self.lookups = []
+
+    def verify_subscription_with_google(self, package_name, purchase_token):
+        self.lookups.append(purchase_token)
+        response = self.responses[purchase_token]
+        if isinstance(response, Exception):
+            raise response
+        return copy.deepcopy(response)
+
+
+def play_response(state: str, expiry_time: datetime) -> dict:
+    response = copy.deepcopy(RECORDED_RESPONSE)
+    response['subscriptionState'] = state
+    response['lineItems'][0]['expiryTime'] = google_time(expiry_time)
+    return response
+
+
+@pytest.fixture
+def subscribe(db, seed_user):
+    def subscribe(purchase_token: str, expiration_date: datetime) -> Users:
+        user = seed_user(subjects_count=0)
+        user.account_type = 1
+        db.add(SubscriptionModel(
+            user_id=user.id,
+            package_name='com.flashly.app',
+            purchase_token=purchase_token,
+            product_id='flashly_premium',
+            start_date=expiration_date - timedelta(days=30),
+            expiration_date=expiration_date,
+            subscription_state='SUBSCRIPTION_STATE_ACTIVE',
+            is_active=True,
+            updated_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        ))
+        db.commit()
+        return user
+
+    return subscribe
+
+
+def test_run_once_reconciles_due_subscriptions(db, subscribe):
+    now = datetime.now(timezone.utc)
+    renewed_user = subscribe('renewed-token-0001', now + timedelta(minutes=10))
+    expired_user = subscribe('expired-token-0001', now - timedelta(minutes=10))
+    failing_user = subscribe('failing-token-0001', now + timedelta(minutes=20))
+    failed_expired_user = subscribe('failing-token-0002', now - timedelta(minutes=5))
+    not_due_user = subscribe('not-due-token-0001', now + timedelta(days=10))
+
+    error = GooglePlaySubscriptionError('Google Play API error: 503')
+    service = FakePlaySubscriptionService({
+        'renewed-token-0001': play_response('SUBSCRIPTION_STATE_ACTIVE', now + timedelta(days=30)),
+        'expired-token-0001': play_response('SUBSCRIPTION_STATE_EXPIRED', now - timedelta(minutes=10)),
+        'failing-token-0001': error,
+        'failing-token-0002': error,
+    })
+    reconciler = SubscriptionReconciler(subscription_service=service, session_factory=database.SessionLocal)
+
+    assert reconciler.run_once() == 4
+
+    db.expire_all()
+    subscriptions = {
+        subscription.purchase_token: subscription for subscription in db.query(SubscriptionModel).all()
+    }
+
+    renewed = subscriptions['renewed-token-0001']
+    assert renewed.is_active
+    assert renewed.expiration_date > now + timedelta(days=29)
+    assert not subscriptions['expired-token-0001'].is_active
+    # A failed lookup only deactivates a subscription that already expired
+    assert subscriptions['failing-token-0001'].is_active
+    assert not subscriptions['failing-token-0002'].is_active
+    assert subscriptions['not-due-token-0001'].is_active
+
+    account_types = {user.id: user.account_type for user in db.query(Users).all()}
+    assert account_types == {
+        renewed_user.id: 1,
+        expired_user.id: 0,
+        failing_user.id: 1,
+        failed_expired_user.id: 0,
+        not_due_user.id: 1,
+    }
+    assert 'not-due-token-0001' not in service.lookups
+
+
+def test_claimed_subscriptions_are_not_checked_again_right_away(db, subscribe):
+    now = datetime.now(timezone.utc)
+    subscribe('failing-token-0001', now + timedelta(minutes=20))
+
+    service = FakePlaySubscriptionService({'failing-token-0001': GooglePlaySubscriptionError('timeout')})
+    reconciler = SubscriptionReconciler(subscription_service=service, session_factory=database.SessionLocal)
+
+    assert reconciler.run_once() == 1
+    assert reconciler.run_once() == 0
+    assert service.lookups == ['failing-token-0001']
@@ -0,0 +1,36 @@
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from models.subscription_model import SubscriptionModel
+from models.user_model import Users
+from services.subscription_service import SubscriptionService
+from usecases.subscriptions import SubscriptionUseCase
+
+
+RECORDED_RESPONSE = json.loads((Path(__file__).parent / 'payloads' / 'subscriptionsv2_active.json').read_text())
+
+
+def test_verified_purchase_upgrades_the_account_right_away(db, seed_user, monkeypatch):
+    response = copy.deepcopy(RECORDED_RESPONSE)
+    response['lineItems'][0]['expiryTime'] = (
+        datetime.now(timezone.utc) + timedelta(days=30)
+    ).isoformat().replace('+00:00', 'Z')
+    monkeypatch.setattr(
+        SubscriptionService, 'verify_subscription_with_google',
+        lambda self, package_name, purchase_token: copy.deepcopy(response)
+    )
+    user = seed_user(subjects_count=0)
+
+    result = SubscriptionUseCase().verify_and_process_subscription(
+        db=db,
+        user_id=str(user.id),
+        package_name='com.flashly.app',
+        purchase_token='purchase-token.AO-J1OxQm3Xy0vH1'
+    )
+
+    assert result['success'], result['error']
+    db.expire_all()
+    assert db.query(SubscriptionModel).one().is_active
+    assert db.get(Users, user.id).account_type == 1
@@ -8,6 +8,7 @@ from starlette import status
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from database import db_dependency
 from models.user_model import Users
 
 
@@ -41,4 +42,22 @@ async def get_current_user_usecase(token: Annotated[str, Depends(oauth2_bearer)]
         
         return {'username': username, 'id': user_id}
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user.')
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user.')
+
+def get_current_user_model_usecase(
+    user: Annotated[dict, Depends(get_current_user_usecase)],
+    db: db_dependency
+) -> Users:
+    """
+    Loads the authenticated user once per request. FastAPI caches dependencies
+    within a request, so every use case that receives it shares the same row.
+    """
+    user_model = db.query(Users).filter(
+        Users.id == user.get('id'),
+        Users.deleted_at.is_(None)
+    ).first()
+
+    if not user_model:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user.')
+
+    return user_model
@@ -1,77 +1,178 @@
 from datetime import datetime, timezone
+import io
 import json
 import os
-from typing import List, Optional, Tuple
+import random
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import func
+from sqlalchemy import func, insert
 
 from core.firebase.client import firebase_file_upload
 from models.flashcard_model import Flashcards
-from models.requests_model import FlashcardRequest
+from models.generation_job_model import GenerationJobs
+from models.requests_model import FlashcardRequest, FlashcardsListRequest
 from models.subject_model import Subjects
-from core.openai import client as openai_client
 from database import db_dependency
 from models.user_model import Users
+from services.generation_service import FlashcardGenerationService
+from services.job_queue import generation_job_queue
 from services.limit_service import LimitService
-from utils.utils import fragment_text
+from services.similarity_service import flashcard_similarity_index
+from utils.pagination import paginate
+from utils.utils import stream_pdf_fragments
 
 
 class FlashcardsUseCase:
-    def __init__(self, db: db_dependency, origin: str = 'user', user_id: str = None):
+    def __init__(self, db: db_dependency, origin: str = 'user', user_id: str = None, user: Users = None):
         self.db = db
         self.origin = origin
         self.user_id = user_id
+        self.user = user
 
-    def generate_flashcards(
+    def stream_flashcards(
         self,
-        content: str,
+        pdf: BinaryIO,
         quantity: int,
         user_id: str,
         subject_id: str,
         topic_id: str,
         difficulty: int = 1
-    ) -> List[dict]:
+    ) -> Iterator[dict]:
         user = self._get_user(user_id)
         limit_service = LimitService(self.db, user, Flashcards, Subjects)
-        
+
         allowed_quantity = limit_service.check_flashcard_quota(origin='ai', quantity=quantity)
-        
-        generated_flashcards = []
-        text_fragments = fragment_text(content)
-        flashcards_created = 0
-
-        for fragment in text_fragments:
-            if flashcards_created >= allowed_quantity:
-                break
-                
-            remaining_quantity = allowed_quantity - flashcards_created
-            flashcards_list = openai_client.flash_card_generator(
-                prompt=fragment,
-                history=generated_flashcards,
-                quantity=min(remaining_quantity, quantity),
-                difficulty=difficulty
-            )
-            
-            flashcards_to_add = flashcards_list[:remaining_quantity]
-            generated_flashcards.extend(flashcards_to_add)
-            flashcards_created += len(flashcards_to_add)
-
-        result = []
-        for flashcard in generated_flashcards:
-            flashcard_model = self._create_flashcard_model(
-                user_id=user_id,
-                subject_id=subject_id,
-                topic_id=topic_id,
-                difficulty=difficulty,
-                origin='ai',
-                question=flashcard.get('question'),
-                answer=flashcard.get('answer'),
-                opened=True
-            )
-            result.append(flashcard_model.to_dict())
 
-        return result
+        text_fragments, expected_fragments = stream_pdf_fragments(pdf)
+
+        persisted_fragments = self._persist_generated_flashcards(
+            text_fragments=text_fragments,
+            expected_fragments=expected_fragments,
+            quantity=allowed_quantity,
+            user_id=user_id,
+            subject_id=subject_id,
+            topic_id=topic_id,
+            difficulty=difficulty,
+            limit_service=limit_service
+        )
+
+        return (flashcard for flashcards in persisted_fragments for flashcard in flashcards)
+
+    def enqueue_generation_job(
+        self,
+        file_content: bytes,
+        quantity: int,
+        user_id: str,
+        subject_id: str,
+        topic_id: str,
+        difficulty: int = 1
+    ) -> dict:
+        user = self._get_user(user_id)
+        limit_service = LimitService(self.db, user, Flashcards, Subjects)
+        limit_service.check_flashcard_quota(origin='ai', quantity=quantity)
+
+        job = generation_job_queue.enqueue(
+            self.db,
+            user_id=user_id,
+            subject_id=subject_id,
+            topic_id=topic_id,
+            quantity=quantity,
+            difficulty=difficulty,
+            file_content=file_content
+        )
+
+        return job.to_dict()
+
+    def process_generation_job(self, job: GenerationJobs) -> None:
+        user = self._get_user(job.user_id)
+        limit_service = LimitService(self.db, user, Flashcards, Subjects)
+
+        allowed_quantity = limit_service.check_flashcard_quota(origin='ai', quantity=job.quantity)
+
+        text_fragments, expected_fragments = stream_pdf_fragments(io.BytesIO(job.file_content))
+
+        job.fragments_total = min(expected_fragments, allowed_quantity)
+        job.updated_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+        persisted_fragments = self._persist_generated_flashcards(
+            text_fragments=text_fragments,
+            expected_fragments=expected_fragments,
+            quantity=allowed_quantity,
+            user_id=job.user_id,
+            subject_id=job.subject_id,
+            topic_id=job.topic_id,
+            difficulty=job.difficulty,
+            limit_service=limit_service
+        )
+
+        for flashcards in persisted_fragments:
+            job.fragments_done += 1
+            job.cards_created += len(flashcards)
+            job.fragments_total = max(job.fragments_total, job.fragments_done)
+            job.updated_at = datetime.now(timezone.utc)
+            self.db.commit()
+
+        job.fragments_total = job.fragments_done
+
+    def retrieve_generation_job(self, user_id: str, job_id: str) -> dict:
+        job = self.db.query(GenerationJobs).filter(
+            GenerationJobs.id == job_id,
+            GenerationJobs.user_id == user_id
+        ).first()
+        if not job:
+            raise HTTPException(status_code=404, detail='Generation job not found')
+        return job.to_dict()
+
+    def _persist_generated_flashcards(
+        self,
+        text_fragments: Iterable[str],
+        expected_fragments: Optional[int],
+        quantity: int,
+        user_id: str,
+        subject_id: str,
+        topic_id: str,
+        difficulty: int,
+        limit_service: LimitService
+    ) -> Iterator[List[dict]]:
+        generation_service = FlashcardGenerationService(difficulty=difficulty)
+
+        generated = generation_service.iter_generated(text_fragments, quantity, expected_fragments)
+        for _, flashcards in generated:
+            flashcards = flashcard_similarity_index.filter_new(self.db, topic_id, flashcards)
+
+            try:
+                yield self._create_flashcard_models([
+                    self._ai_flashcard_data(flashcard, subject_id, topic_id, difficulty)
+                    for flashcard in flashcards
+                ], limit_service=limit_service)
+            except HTTPException as e:
+                # Another request spent the rest of today's quota
+                print(f"Geração interrompida: {e.detail}")
+                return
+
+    def create_flashcards_bulk(self, flashcards_request: FlashcardsListRequest) -> List[dict]:
+        user = self._get_user(self.user_id)
+        limit_service = LimitService(self.db, user, Flashcards, Subjects)
+
+        quantity = len(flashcards_request.data)
+        if limit_service.check_flashcard_quota(origin='user', quantity=quantity) < quantity:
+            raise HTTPException(status_code=400, detail='Flashcard limit reached')
+
+        try:
+            return self._create_flashcard_models([
+                {**flashcard.model_dump(), 'opened': flashcard.opened if flashcard.opened is not None else True}
+                for flashcard in flashcards_request.data
+            ], limit_service=limit_service, allow_partial=False)
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error creating flashcards: {str(e)}"
+            )
 
     def create_flashcard(
         self,
@@ -88,13 +189,16 @@ class FlashcardsUseCase:
             else:
                 flashcard_data = flashcard_request.model_dump()
 
-            flashcard_model = self._create_flashcard_model(**flashcard_data)
+            flashcard_model = self._create_flashcard_model(limit_service, **flashcard_data)
 
             if file:
                 self._handle_file_upload(flashcard_model, file)
 
             return flashcard_model.to_dict()
 
+        except HTTPException:
+            self.db.rollback()
+            raise
         except Exception as e:
             self.db.rollback()
             raise HTTPException(
@@ -109,41 +213,79 @@ class FlashcardsUseCase:
         limit: Optional[int] = 20,
         offset: Optional[int] = 0,
         difficulties: Optional[List[int]] = None,
-        ai_generated: Optional[bool] = None
-    ) -> Tuple[List[dict], int]:
-        query = self.db.query(Flashcards).filter(
-            Flashcards.topic_id == topic_id,
-            Flashcards.user_id == user_id,
-            Flashcards.deleted_at.is_(None)
-        )
-
-        if difficulties:
-            query = query.filter(Flashcards.difficulty.in_(difficulties))
-
-        if ai_generated is not None:
-            origin = "ai" if ai_generated else "user"
-            query = query.filter(Flashcards.origin == origin)
-
-        total_count = query.count()
-
-        if limit is None and offset is None:
-            query = query.order_by(func.random())
+        ai_generated: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        include_count: bool = True
+    ) -> Tuple[List[dict], Optional[int], Optional[str]]:
+        query = self._flashcards_query(topic_id, user_id, difficulties, ai_generated)
+
+        if include_count and cursor is None:
+            # The total comes with the page through COUNT(*) OVER(), so the
+            # filter is evaluated once; only a page past the end needs a count()
+            rows, next_cursor = paginate(
+                query.add_columns(func.count().over().label('total_count')), Flashcards, limit, offset
+            )
+            flashcards = [row[0] for row in rows]
+            total_count = rows[0].total_count if rows else (query.count() if offset else 0)
         else:
-            if limit is not None:
-                query = query.limit(limit)
-            if offset is not None:
-                query = query.offset(offset)
+            # With a cursor the window would only count the rows after it
+            total_count = query.count() if include_count else None
+            flashcards, next_cursor = paginate(query, Flashcards, limit, offset, cursor)
 
-        flashcards = query.all()
         result = [flashcard.to_dict() for flashcard in flashcards]
 
-        return result, total_count
+        return result, total_count, next_cursor
+
+    def retrieve_flashcard_deck(
+        self,
+        topic_id: str,
+        user_id: str,
+        seed: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        difficulties: Optional[List[int]] = None,
+        ai_generated: Optional[bool] = None
+    ) -> dict:
+        """
+        Returns the flashcards of a topic in a random order that is fully
+        determined by the seed, so a client can resume a study session by
+        requesting the next pages with the same seed.
+
+        Only the ids are read and shuffled; the full rows are loaded for the
+        requested page alone.
+        """
+        flashcard_ids = [
+            flashcard_id for flashcard_id, in self._flashcards_query(
+                topic_id, user_id, difficulties, ai_generated, Flashcards.id
+            ).order_by(Flashcards.created_at, Flashcards.id).all()
+        ]
+
+        if seed is None:
+            seed = random.randrange(2 ** 31)
+        random.Random(seed).shuffle(flashcard_ids)
+
+        page_ids = flashcard_ids[offset:offset + limit if limit else None]
+
+        flashcards_by_id = {}
+        if page_ids:
+            flashcards_by_id = {
+                flashcard.id: flashcard
+                for flashcard in self.db.query(Flashcards).filter(Flashcards.id.in_(page_ids)).all()
+            }
+
+        return {
+            "flashcards": [flashcards_by_id[flashcard_id].to_dict() for flashcard_id in page_ids],
+            "count": len(flashcard_ids),
+            "seed": seed
+        }
 
     def delete_flashcard(self, user_id: str, flashcard_id: int) -> None:
         flashcard_model = self._get_flashcard(user_id, flashcard_id)
         flashcard_model.deleted_at = datetime.now(timezone.utc)
         self.db.commit()
 
+        flashcard_similarity_index.remove(flashcard_model.topic_id, flashcard_model.id)
+
     def update_flashcard(
         self,
         user_id: str,
@@ -152,6 +294,7 @@ class FlashcardsUseCase:
         file: UploadFile = None
     ) -> dict:
         flashcard_model = self._get_flashcard(user_id, flashcard_id)
+        previous_topic_id = flashcard_model.topic_id
 
         try:
             if isinstance(flashcard_request, str):
@@ -171,6 +314,9 @@ class FlashcardsUseCase:
             self.db.commit()
             self.db.refresh(flashcard_model)
 
+            flashcard_similarity_index.remove(previous_topic_id, flashcard_model.id)
+            flashcard_similarity_index.add(flashcard_model.topic_id, flashcard_model.id, flashcard_model.question)
+
             return flashcard_model.to_dict()
 
         except Exception as e:
@@ -181,6 +327,9 @@ class FlashcardsUseCase:
             )
 
     def _get_user(self, user_id: str) -> Users:
+        if self.user is not None and str(self.user.id) == str(user_id):
+            return self.user
+
         user = self.db.query(Users).filter(
             Users.id == user_id,
             Users.deleted_at.is_(None)
@@ -189,6 +338,29 @@ class FlashcardsUseCase:
             raise HTTPException(status_code=404, detail='User not found')
         return user
 
+    def _flashcards_query(
+        self,
+        topic_id: str,
+        user_id: str,
+        difficulties: Optional[List[int]],
+        ai_generated: Optional[bool],
+        *entities
+    ):
+        query = self.db.query(*(entities or (Flashcards,))).filter(
+            Flashcards.topic_id == topic_id,
+            Flashcards.user_id == user_id,
+            Flashcards.deleted_at.is_(None)
+        )
+
+        if difficulties:
+            query = query.filter(Flashcards.difficulty.in_(difficulties))
+
+        if ai_generated is not None:
+            origin = "ai" if ai_generated else "user"
+            query = query.filter(Flashcards.origin == origin)
+
+        return query
+
     def _get_flashcard(self, user_id: str, flashcard_id: int) -> Flashcards:
         flashcard = self.db.query(Flashcards).filter(
             Flashcards.id == flashcard_id,
@@ -199,17 +371,66 @@ class FlashcardsUseCase:
             raise HTTPException(status_code=404, detail='Flashcard not found')
         return flashcard
 
-    def _create_flashcard_model(self, **kwargs) -> Flashcards:
+    def _create_flashcard_model(self, limit_service: LimitService, **kwargs) -> Flashcards:
         flashcard_model = Flashcards(**kwargs)
 
         flashcard_model.user_id = self.user_id
         flashcard_model.origin = self.origin
 
+        limit_service.reserve_flashcards(origin=self.origin, quantity=1)
+
         self.db.add(flashcard_model)
         self.db.commit()
         self.db.refresh(flashcard_model)
+
+        flashcard_similarity_index.add(flashcard_model.topic_id, flashcard_model.id, flashcard_model.question)
         return flashcard_model
 
+    def _create_flashcard_models(
+        self,
+        flashcards_data: List[dict],
+        limit_service: LimitService,
+        allow_partial: bool = True
+    ) -> List[dict]:
+        """
+        Inserts all flashcards with a single INSERT ... RETURNING and one commit,
+        building the response from the returned rows instead of refreshing them.
+        The daily quota is reserved in the same transaction; when it only covers
+        part of the batch, the rest is dropped unless allow_partial is False.
+        """
+        if not flashcards_data:
+            return []
+
+        try:
+            granted = limit_service.reserve_flashcards(origin=self.origin, quantity=len(flashcards_data))
+            if granted < len(flashcards_data) and not allow_partial:
+                raise HTTPException(status_code=400, detail='Flashcard limit reached')
+        except HTTPException:
+            self.db.rollback()
+            raise
+
+        rows = [{**data, 'user_id': self.user_id, 'origin': self.origin} for data in flashcards_data[:granted]]
+
+        flashcard_models = self.db.scalars(insert(Flashcards).returning(Flashcards), rows).all()
+        result = [flashcard_model.to_dict() for flashcard_model in flashcard_models]
+        self.db.commit()
+
+        for flashcard in result:
+            flashcard_similarity_index.add(flashcard['topic_id'], flashcard['id'], flashcard['question'])
+
+        return result
+
+    @staticmethod
+    def _ai_flashcard_data(flashcard: dict, subject_id: str, topic_id: str, difficulty: int) -> dict:
+        return {
+            'subject_id': subject_id,
+            'topic_id': topic_id,
+            'difficulty': difficulty,
+            'question': flashcard.get('question'),
+            'answer': flashcard.get('answer'),
+            'opened': True
+        }
+
     def _handle_file_upload(self, flashcard_model: Flashcards, file: UploadFile) -> None:
         try:
             image_url = firebase_file_upload(
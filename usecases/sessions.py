@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 from models.requests_model import SessionFlashcardRequest
 from models.session_flashcards_model import SessionFlashcards
 from models.session_model import Sessions
 from database import db_dependency
+from utils.pagination import paginate
 
 
 def create_session_usecase(db: db_dependency, session_request: SessionFlashcardRequest,  user_id: str) -> dict:
@@ -22,13 +23,20 @@ def create_session_usecase(db: db_dependency, session_request: SessionFlashcardR
 
     return session_data
 
-def retrieve_sessions_usecase(db: db_dependency, user_id: str, limit: int, offset: int, search: str) -> List[dict]:
+def retrieve_sessions_usecase(
+    db: db_dependency,
+    user_id: str,
+    limit: int,
+    offset: int,
+    search: str,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
     query = db.query(Sessions).filter(Sessions.user_id == user_id).filter(Sessions.deleted_at == None)
     
     if search:
         query = query.filter(Sessions.topic_name.ilike(f"%{search}%"))
 
-    sessions = query.offset(offset).limit(limit).all()
+    sessions, next_cursor = paginate(query, Sessions, limit, offset, cursor, descending=True)
     result = [session.to_dict() for session in sessions]
 
-    return result
+    return result, next_cursor
@@ -1,5 +1,6 @@
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy import func
@@ -8,98 +9,38 @@ from models.flashcard_model import Flashcards
 from models.requests_model import SubjectRequest
 from models.session_model import Sessions
 from models.subject_model import Subjects
-from models.subscription_model import SubscriptionModel
 from models.topic_model import Topics
 from models.user_model import Users
 from services.limit_service import LimitService
-from services.subscription_service import SubscriptionService, GooglePlaySubscriptionError
+from services.similarity_service import flashcard_similarity_index
+from utils.pagination import paginate
 
 
 class SubjectsUseCase:
-    def __init__(self, db: db_dependency, user_id: str = None):
+    def __init__(self, db: db_dependency, user_id: str = None, user: Users = None):
         self.db = db
         self.user_id = user_id
-        self.subscription_service = SubscriptionService()
+        self.user = user
 
-    def _get_user_subscription(self) -> Optional[SubscriptionModel]:
-        return self.db.query(SubscriptionModel).filter(
-            SubscriptionModel.user_id == self.user_id,
-            SubscriptionModel.is_active == True,
-            SubscriptionModel.deleted_at.is_(None)
-        ).first()
-
-    def _verify_and_update_subscription(self, subscription: SubscriptionModel) -> bool:
-        try:
-            subscription_data, status_info = self.subscription_service.get_complete_subscription_info(
-                subscription.package_name,
-                subscription.purchase_token
-            )
-            
-            subscription.subscription_state = subscription_data.subscription_state.value
-            subscription.expiration_date = subscription_data.expiration_date
-            subscription.auto_renewing = subscription_data.auto_renewing
-            subscription.is_active = status_info.is_active
-            subscription.updated_at = datetime.now(timezone.utc)
-            
-            if subscription_data.price:
-                subscription.currency_code = subscription_data.price.currency_code
-                subscription.price_nanos = subscription_data.price.nanos
-            
-            self.db.commit()
-            
-            return status_info.is_active
-            
-        except GooglePlaySubscriptionError:
-            subscription.is_active = False
-            subscription.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
-            return False
-
-    def _determine_user_account_type(self, user: Users) -> int:
-        subscription = self._get_user_subscription()
-        
-        if not subscription:
-            return 0
-            
-        is_active = self._verify_and_update_subscription(subscription)
-        
-        return 1 if is_active else 0
-    
     def _get_statistics(self) -> dict:        
         total_cards = self.db.query(func.count(Flashcards.id)).filter(
             Flashcards.user_id == self.user_id,
             Flashcards.deleted_at.is_(None)
         ).scalar() or 0
         
-        sessions = self.db.query(Sessions.total_time_spent).filter(
-            Sessions.user_id == self.user_id,
-            Sessions.deleted_at.is_(None)
-        ).all()
-        
-        total_seconds = 0
-        for session in sessions:
-            time_str = session.total_time_spent
-            if time_str:
-                try:
-                    time_parts = time_str.split(':')
-                    hours = int(time_parts[0])
-                    minutes = int(time_parts[1])
-                    seconds = int(time_parts[2])
-                    total_seconds += hours * 3600 + minutes * 60 + seconds
-                except (ValueError, IndexError):
-                    continue
-        
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        time_spend = f"{hours:02d}h {minutes:02d}m"
-        
         sessions_stats = self.db.query(
             func.sum(Sessions.correct_answer_count).label('total_correct'),
-            func.sum(Sessions.total_questions).label('total_questions')
+            func.sum(Sessions.total_questions).label('total_questions'),
+            func.sum(Sessions.duration_seconds).label('total_seconds')
         ).filter(
             Sessions.user_id == self.user_id,
             Sessions.deleted_at.is_(None)
         ).first()
+
+        total_seconds = int(sessions_stats.total_seconds or 0) if sessions_stats else 0
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        time_spend = f"{hours:02d}h {minutes:02d}m"
         
         accuracy = 0.0
         if sessions_stats and sessions_stats.total_questions and sessions_stats.total_questions > 0:
@@ -121,34 +62,45 @@ class SubjectsUseCase:
         }
 
 
-    def retrieve_all_subjects_usecase(self, limit: int, offset: int, search: str) -> List[dict]:
+    def retrieve_all_subjects_usecase(
+        self,
+        limit: int,
+        offset: int,
+        search: str,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
         query = self.db.query(Subjects).filter(Subjects.user_id == self.user_id).filter(Subjects.deleted_at.is_(None))
 
         if search:
             query = query.filter(Subjects.subject_name.ilike(f"%{search}%"))
 
-        subjects = query.offset(offset).limit(limit).all()
+        subjects, next_cursor = paginate(query, Subjects, limit, offset, cursor)
+
+        if not subjects:
+            return [], None
+
+        topics_with_count = self.db.query(
+            Topics,
+            func.count(Flashcards.id).label('count')
+        ).outerjoin(
+            Flashcards,
+            (Flashcards.topic_id == Topics.id) & (Flashcards.deleted_at.is_(None))
+        ).filter(
+            Topics.subject_id.in_([subject.id for subject in subjects]),
+            Topics.deleted_at.is_(None)
+        ).group_by(Topics.id).all()
+
+        topics_by_subject = defaultdict(list)
+        for topic, count in topics_with_count:
+            topic_dict = topic.to_dict()
+            topic_dict['count'] = count
+            topics_by_subject[topic.subject_id].append(topic_dict)
+
+        statistics = self._get_statistics()
 
         result = []
 
         for subject in subjects:
-            topics_with_count = self.db.query(
-                Topics,
-                func.count(Flashcards.id).label('count')
-            ).outerjoin(
-                Flashcards,
-                (Flashcards.topic_id == Topics.id) & (Flashcards.deleted_at.is_(None))
-            ).filter(
-                Topics.subject_id == subject.id,
-                Topics.deleted_at.is_(None)
-            ).group_by(Topics.id).all()
-
-            topics_list = []
-            for topic, count in topics_with_count:
-                topic_dict = topic.to_dict()
-                topic_dict['count'] = count
-                topics_list.append(topic_dict)
-
             result.append({
                 "id": subject.id,
                 "user_id": subject.user_id,
@@ -157,32 +109,25 @@ class SubjectsUseCase:
                 "subject_name": subject.subject_name,
                 "image_url": subject.image_url,
                 "deleted_at": subject.deleted_at,
-                "statistics": self._get_statistics(),
-                "topics": topics_list
+                "statistics": statistics,
+                "topics": topics_by_subject[subject.id]
             })
 
-        return result
+        return result, next_cursor
 
     def create_subject_usecase(self, subject_request: SubjectRequest) -> dict:
-        user = self.db.query(Users).filter(Users.id == self.user_id, Users.deleted_at.is_(None)).first()
-        account_type = self._determine_user_account_type(user)
-        
-        original_account_type = user.account_type
-        user.account_type = account_type
+        user = self.user or self.db.query(Users).filter(Users.id == self.user_id, Users.deleted_at.is_(None)).first()
 
-        try:
-            limit_service = LimitService(self.db, user, Flashcards, Subjects)
-            limit_service.check_subject_quota()
+        # account_type is kept current by the subscription reconciler
+        limit_service = LimitService(self.db, user, Flashcards, Subjects)
+        limit_service.reserve_subject()
 
-            subject_model = Subjects(**subject_request.model_dump(), user_id=self.user_id)
-            self.db.add(subject_model)
-            self.db.commit()
-            self.db.refresh(subject_model)
+        subject_model = Subjects(**subject_request.model_dump(), user_id=self.user_id)
+        self.db.add(subject_model)
+        self.db.commit()
+        self.db.refresh(subject_model)
 
-            return subject_model.to_dict()
-            
-        finally:
-            user.account_type = original_account_type
+        return subject_model.to_dict()
 
     def update_subject_usecase(self, subject_request: SubjectRequest, subject_id: str) -> dict:
         subject_model = self.db.query(Subjects).filter(Subjects.id == subject_id)\
@@ -220,6 +165,10 @@ class SubjectsUseCase:
             raise HTTPException(status_code=404, detail='Subject not found')
 
         now = datetime.now(timezone.utc)
+
+        topic_ids = [
+            topic_id for topic_id, in self.db.query(Topics.id).filter(Topics.subject_id == subject_id).all()
+        ]
         
         self.db.query(Sessions).filter(Sessions.subject_id == subject_id).update({
             "deleted_at": now
@@ -235,3 +184,6 @@ class SubjectsUseCase:
 
         subject_model.deleted_at = now
         self.db.commit()
+
+        for topic_id in topic_ids:
+            flashcard_similarity_index.drop_topic(topic_id)
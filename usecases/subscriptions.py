@@ -1,13 +1,118 @@
+import base64
+import json
 from typing import Dict, Any, Optional
 from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from models.play_notification_model import PlayNotifications
 from models.subscription_model import SubscriptionModel
-from services.subscription_service import SubscriptionData, SubscriptionService
+from services.subscription_cache import subscription_status_cache
+from services.subscription_reconciler import apply_subscription_info, sync_account_types
+from services.subscription_service import GooglePlaySubscriptionError, SubscriptionData, SubscriptionService
 
 
 class SubscriptionUseCase:    
+    # Notification types after which Google Play no longer grants access
+    ENDED_NOTIFICATION_TYPES = {
+        12,  # SUBSCRIPTION_REVOKED
+        13   # SUBSCRIPTION_EXPIRED
+    }
+
     def __init__(self):
         self.subscription_service = SubscriptionService()
+
+    def process_rtdn(self, db: Session, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applies a Google Play Real-Time Developer Notification delivered by a
+        Pub/Sub push.
+
+        The notification only says that a purchase token changed, so its current
+        state is read once from Google and written to the stored subscription and
+        the user's account_type. Redeliveries of the same Pub/Sub message are
+        dropped through the unique message_id of play_notifications; the record is
+        committed together with the update, so a failure lets Pub/Sub retry.
+        """
+        message = envelope.get("message") or {}
+        if not isinstance(message, dict):
+            raise ValueError("Mensagem Pub/Sub inválida")
+
+        message_id = message.get("messageId") or message.get("message_id")
+        if not message_id or not message.get("data"):
+            raise ValueError("Mensagem Pub/Sub inválida")
+
+        notification = json.loads(base64.b64decode(message["data"]))
+        if not isinstance(notification, dict):
+            raise ValueError("Notificação do Google Play inválida")
+
+        subscription_notification = notification.get("subscriptionNotification") or {}
+        if not isinstance(subscription_notification, dict):
+            raise ValueError("Notificação do Google Play inválida")
+
+        package_name = notification.get("packageName")
+        purchase_token = subscription_notification.get("purchaseToken")
+        notification_type = subscription_notification.get("notificationType")
+        event_time_millis = notification.get("eventTimeMillis")
+
+        recorded = db.execute(
+            insert(PlayNotifications).values(
+                message_id=message_id,
+                package_name=package_name,
+                purchase_token=purchase_token,
+                notification_type=notification_type,
+                event_time=datetime.fromtimestamp(int(event_time_millis) / 1000, timezone.utc) if event_time_millis else None,
+                received_at=datetime.now(timezone.utc)
+            ).on_conflict_do_nothing(index_elements=['message_id']).returning(PlayNotifications.id)
+        ).first()
+
+        if not recorded:
+            return {"status": "duplicate"}
+
+        if not purchase_token:
+            # Test and one-time product notifications carry no subscription
+            db.commit()
+            return {"status": "ignored"}
+
+        try:
+            subscription_info = self.subscription_service.get_complete_subscription_info(package_name, purchase_token)
+        except GooglePlaySubscriptionError:
+            if notification_type not in self.ENDED_NOTIFICATION_TYPES:
+                db.rollback()
+                raise
+            subscription_info = None
+
+        subscription = db.query(SubscriptionModel).filter(
+            SubscriptionModel.purchase_token == purchase_token,
+            SubscriptionModel.deleted_at.is_(None)
+        ).with_for_update().first()
+
+        linked_purchase_token = subscription_info[0].linked_purchase_token if subscription_info else None
+        if not subscription and linked_purchase_token:
+            # Upgrades and resubscriptions replace the token of the subscription
+            subscription = db.query(SubscriptionModel).filter(
+                SubscriptionModel.purchase_token == linked_purchase_token,
+                SubscriptionModel.deleted_at.is_(None)
+            ).with_for_update().first()
+            if subscription:
+                subscription_status_cache.invalidate(subscription.purchase_token)
+                subscription.purchase_token = purchase_token
+
+        if not subscription:
+            # Not linked to a user yet; verify-subscription will store it
+            db.commit()
+            return {"status": "unknown_subscription"}
+
+        if subscription_info:
+            apply_subscription_info(subscription, subscription_info)
+        else:
+            subscription.is_active = False
+            subscription.updated_at = datetime.now(timezone.utc)
+            subscription_status_cache.invalidate(purchase_token)
+
+        db.flush()
+        sync_account_types(db, {subscription.user_id})
+        db.commit()
+
+        return {"status": "processed", "is_active": subscription.is_active}
     
     def verify_and_process_subscription(
         self, 
@@ -26,12 +131,18 @@ class SubscriptionUseCase:
             subscription_data = self.subscription_service.extract_subscription_data(
                 google_response, package_name, purchase_token
             )
+
+            # Replace whatever the profile loads cached with the state just read
+            subscription_status_cache.put(purchase_token, (subscription_data, status_info))
             
             subscription_record = None
             if status_info.should_save_to_database:
                 subscription_record = self._create_or_update_subscription(
                     db, user_id, subscription_data
                 )
+                # Quotas read the stored account_type, so it has to change with the purchase
+                sync_account_types(db, {subscription_record.user_id})
+                db.commit()
             
             return {
                 "success": True,
@@ -54,6 +165,7 @@ class SubscriptionUseCase:
             }
             
         except Exception as e:
+            subscription_status_cache.invalidate(purchase_token)
             return {
                 "success": False,
                 "error": str(e),
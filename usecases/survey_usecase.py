@@ -16,8 +16,9 @@ from schemas.survey_schemas import (
 
 class SurveyUseCase:
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, user: Users = None):
         self.db = db
+        self.user = user
     
     def get_current_survey(self, user_id: UUID) -> SurveyResponse:
         current_survey = self.db.query(Survey).filter(
@@ -97,9 +98,9 @@ class SurveyUseCase:
         return self._build_survey_response(survey, user_id)
     
     def create_survey(self, survey_data: CreateSurveyRequest, user_id: str) -> SurveyResponse:
-        user = self.db.query(Users).filter(Users.id == user_id, Users.deleted_at.is_(None)).first()
+        user = self.user or self.db.query(Users).filter(Users.id == user_id, Users.deleted_at.is_(None)).first()
 
-        if not user.is_admin:
+        if not user or not user.is_admin:
             raise HTTPException(status_code=404, detail='Admin access required')
 
         active_survey = self.db.query(Survey).filter(
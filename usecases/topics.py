@@ -7,6 +7,7 @@ from models.flashcard_model import Flashcards
 from models.requests_model import TopicRequest
 from models.session_model import Sessions
 from models.topic_model import Topics
+from services.similarity_service import flashcard_similarity_index
 from database import db_dependency
 
 
@@ -35,77 +36,70 @@ class TopicUseCase:
             Topics.subject_id == self.subject_id,
             Topics.deleted_at.is_(None)
         ).all()
-        
-        result = []
-        
-        for topic in topics:
-            flashcards_count = self.db.query(func.count(Flashcards.id)).filter(
-                Flashcards.topic_id == topic.id,
-                Flashcards.deleted_at.is_(None)
-            ).scalar() or 0
-            
-            sessions_stats = self.db.query(
+
+        if not topics:
+            return []
+
+        topic_ids = [topic.id for topic in topics]
+
+        flashcards_counts = dict(self.db.query(
+            Flashcards.topic_id,
+            func.count(Flashcards.id)
+        ).filter(
+            Flashcards.topic_id.in_(topic_ids),
+            Flashcards.deleted_at.is_(None)
+        ).group_by(Flashcards.topic_id).all())
+
+        sessions_stats = {
+            row.topic_id: row for row in self.db.query(
+                Sessions.topic_id,
                 func.sum(Sessions.correct_answer_count).label('total_correct'),
-                func.sum(Sessions.total_questions).label('total_questions')
+                func.sum(Sessions.total_questions).label('total_questions'),
+                func.sum(Sessions.duration_seconds).label('total_seconds'),
+                func.max(Sessions.created_at).label('last_study')
             ).filter(
-                Sessions.topic_id == topic.id,
+                Sessions.topic_id.in_(topic_ids),
                 Sessions.deleted_at.is_(None)
-            ).first()
-            
+            ).group_by(Sessions.topic_id).all()
+        }
+
+        now = datetime.now(timezone.utc)
+        result = []
+
+        for topic in topics:
+            stats = sessions_stats.get(topic.id)
+
             accuracy = 0.0
-            if sessions_stats and sessions_stats.total_questions and sessions_stats.total_questions > 0:
-                accuracy = round((sessions_stats.total_correct / sessions_stats.total_questions) * 100, 2)
-            
-            sessions = self.db.query(Sessions.total_time_spent).filter(
-                Sessions.topic_id == topic.id,
-                Sessions.deleted_at.is_(None)
-            ).all()
-            
-            total_seconds = 0
-            for session in sessions:
-                time_str = session.total_time_spent
-                if time_str:
-                    try:
-                        time_parts = time_str.split(':')
-                        hours = int(time_parts[0])
-                        minutes = int(time_parts[1])
-                        seconds = int(time_parts[2])
-                        total_seconds += hours * 3600 + minutes * 60 + seconds
-                    except (ValueError, IndexError):
-                        continue
-            
+            if stats and stats.total_questions and stats.total_questions > 0:
+                accuracy = round((stats.total_correct / stats.total_questions) * 100, 2)
+
+            total_seconds = int(stats.total_seconds or 0) if stats else 0
             hours = total_seconds // 3600
             minutes = (total_seconds % 3600) // 60
             seconds = total_seconds % 60
             time_spent = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
-            last_session = self.db.query(Sessions.created_at).filter(
-                Sessions.topic_id == topic.id,
-                Sessions.deleted_at.is_(None)
-            ).order_by(Sessions.created_at.desc()).first()
-            
+
             seconds_since_last_study = None
-            if last_session and last_session.created_at:
-                now = datetime.now(timezone.utc)
-                last_study_time = last_session.created_at
+            if stats and stats.last_study:
+                last_study_time = stats.last_study
                 if last_study_time.tzinfo is None:
                     last_study_time = last_study_time.replace(tzinfo=timezone.utc)
-                
+
                 time_diff = now - last_study_time
                 seconds_since_last_study = int(time_diff.total_seconds())
-            
+
             topic_dict = topic.to_dict()
             topic_dict.update({
                 'statistics': {
-                    'flashcards_count': flashcards_count,
+                    'flashcards_count': flashcards_counts.get(topic.id, 0),
                     'accuracy': accuracy,
                     'time_spent': time_spent,
                     'seconds_since_last_study': seconds_since_last_study
                 }
             })
-            
+
             result.append(topic_dict)
-        
+
         return result
 
     def update_topic(self, topic_request: TopicRequest) -> dict:
@@ -143,4 +137,6 @@ class TopicUseCase:
         
         self.db.query(Flashcards).filter(Flashcards.topic_id == self.topic_id).delete()
         self.db.query(Topics).filter(Topics.id == self.topic_id).delete()
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+
+        flashcard_similarity_index.drop_topic(self.topic_id)
\ No newline at end of file
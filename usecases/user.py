@@ -11,16 +11,21 @@ from models.topic_model import Topics
 from models.user_model import Users
 from models.subscription_model import SubscriptionModel
 from services.limit_service import LimitService
+from services.subscription_cache import subscription_status_cache
 from services.subscription_service import SubscriptionService
 from utils.utils import validate_file_size
 
 
 class UserUseCase:
-    def __init__(self, db: db_dependency):
+    def __init__(self, db: db_dependency, user: Users = None):
         self.db = db
+        self.user = user
         self.subscription_service = SubscriptionService()
     
     def _get_user_by_id(self, user_id: str) -> Users:
+        if self.user is not None and str(self.user.id) == str(user_id):
+            return self.user
+
         user_model = self.db.query(Users).filter(
             Users.id == user_id, 
             Users.deleted_at.is_(None)
@@ -42,19 +47,17 @@ class UserUseCase:
             return None, None
         
         try:
-            is_active = self.subscription_service.check_subscription_active(
-                subscription_model.package_name, 
-                subscription_model.purchase_token
+            subscription_data_obj, subscription_status_obj = subscription_status_cache.get_or_fetch(
+                subscription_model.purchase_token,
+                lambda: self.subscription_service.get_complete_subscription_info(
+                    subscription_model.package_name,
+                    subscription_model.purchase_token
+                )
             )
             
-            if not is_active:
+            if not subscription_status_obj.is_active:
                 return None, None
             
-            subscription_data_obj, subscription_status_obj = self.subscription_service.get_complete_subscription_info(
-                subscription_model.package_name,
-                subscription_model.purchase_token
-            )
-            
             subscription_data = {
                 'package_name': subscription_data_obj.package_name,
                 'product_id': subscription_data_obj.product_id,
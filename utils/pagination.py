@@ -0,0 +1,67 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    payload = json.dumps([created_at.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+
+def paginate(
+    query,
+    model,
+    limit: Optional[int],
+    offset: Optional[int] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    Orders the query by (created_at, id) and returns one page of it along with
+    the cursor of the next page.
+
+    When cursor is None the page is selected with OFFSET/LIMIT and no next
+    cursor is returned. Otherwise the page starts right after the row encoded
+    in the cursor (an empty cursor means the first page), which an index on
+    created_at can seek to directly no matter how deep the page is.
+    """
+    sort_key = tuple_(model.created_at, model.id)
+
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at, model.id)
+
+    if cursor is None:
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all(), None
+
+    if cursor:
+        last_key = tuple_(*decode_cursor(cursor))
+        query = query.filter(sort_key < last_key if descending else sort_key > last_key)
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class PdfTextCache:
+    """
+    Cache of text extracted from PDF files, keyed by the SHA-256 of the file bytes.
+
+    The most recently used entries are kept in memory and every entry is also
+    written to disk, so a repeated upload skips PyPDF2 even after a restart.
+    Both levels are bounded and evict the least recently used entries.
+    """
+
+    def __init__(self, max_entries: int = None, max_disk_entries: int = None, cache_dir: str = None):
+        self.max_entries = max_entries or int(os.getenv('PDF_CACHE_MAX_ENTRIES', 64))
+        self.max_disk_entries = max_disk_entries or int(os.getenv('PDF_CACHE_MAX_DISK_ENTRIES', 1024))
+        self.cache_dir = cache_dir or os.getenv(
+            'PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'flashly-pdf-cache')
+        )
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        path = self._path_for(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as cached_file:
+                text = cached_file.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, text)
+
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._remember(key, text)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            temp_path = f"{self._path_for(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as cached_file:
+                cached_file.write(text)
+            os.replace(temp_path, self._path_for(key))
+
+            self._evict_disk()
+        except OSError as e:
+            print(f"Erro ao gravar cache de PDF: {e}")
+
+    def open_writer(self, key: str) -> "PdfTextCacheWriter":
+        return PdfTextCacheWriter(self, key)
+
+    def _evict_disk(self) -> None:
+        paths = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith('.txt')
+        ]
+
+        if len(paths) <= self.max_disk_entries:
+            return
+
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._entries)
+            }
+
+
+class PdfTextCacheWriter:
+    """
+    Streams a text to the disk level of the cache chunk by chunk, so a document
+    can be cached while it is extracted without holding all of it in memory.
+    Nothing is visible in the cache until commit() is called.
+    """
+
+    def __init__(self, cache: PdfTextCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.temp_path = f"{cache._path_for(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._file = None
+        self._failed = False
+
+    def write(self, chunk: str) -> None:
+        if self._failed:
+            return
+
+        try:
+            if self._file is None:
+                os.makedirs(self.cache.cache_dir, exist_ok=True)
+                self._file = open(self.temp_path, 'w', encoding='utf-8')
+            self._file.write(chunk)
+        except OSError as e:
+            print(f"Erro ao gravar cache de PDF: {e}")
+            self._failed = True
+
+    def commit(self) -> None:
+        if self._failed:
+            return
+
+        self.write('')
+        if self._failed:
+            return
+
+        try:
+            self._file.close()
+            self._file = None
+            os.replace(self.temp_path, self.cache._path_for(self.key))
+            self.cache._evict_disk()
+        except OSError as e:
+            print(f"Erro ao gravar cache de PDF: {e}")
+            self._failed = True
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+
+pdf_text_cache = PdfTextCache()
@@ -1,52 +1,234 @@
 import io
-from typing import List
+import multiprocessing
+import re
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Tuple
 import PyPDF2
 import tiktoken
 import os
 from fastapi import HTTPException, UploadFile
 from PIL import Image
 
+from utils.pdf_cache import pdf_text_cache
+
 
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 5MB
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', 40))
+# Only used to spread the quantity over an uncached PDF: a low estimate gives
+# the first fragments larger shares, a high one leaves more for the last fragment.
+AVG_TOKENS_PER_PAGE = 700
+_SENTENCE_END = re.compile(rb'[.!?]["\')\]]?\s')
 
-def pdf_to_text(pdf) -> str:
-    pdf.seek(0, os.SEEK_END)
-    file_size = pdf.tell()
+_extraction_pool = None
+_extraction_workers = 0
+_extraction_pool_lock = threading.Lock()
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool, _extraction_workers
+
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_workers = int(os.getenv('PDF_EXTRACTION_WORKERS', 0)) or os.cpu_count() or 1
+            # Spawned, not forked: the pool is created from a request thread
+            # while other threads may be holding locks
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=_extraction_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _extraction_pool
+
+def _extract_page_range(path: str, start: int, end: int) -> str:
+    reader = PyPDF2.PdfReader(path)
+    return ''.join(reader.pages[page_num].extract_text() for page_num in range(start, end))
+
+def _extract_pages_parallel(data: bytes, page_count: int) -> Iterator[str]:
+    """
+    Splits the pages in contiguous ranges, two per worker, and extracts them in
+    the process pool. The texts are yielded in page order as soon as each range
+    is ready.
+
+    Only one range per worker is in flight at a time, so a slow consumer does
+    not leave extracted text piling up and a closed generator stops the work.
+
+    The document is written once to a temporary file that the workers open, so
+    only its path and the page bounds are sent to them.
+    """
+    pool = _get_extraction_pool()
+    chunks = min(page_count, _extraction_workers * 2)
+    bounds = [page_count * index // chunks for index in range(chunks + 1)]
+
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as pdf_file:
+        pdf_file.write(data)
+        pdf_file.flush()
+
+        pending = deque()
+        try:
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                if len(pending) >= _extraction_workers:
+                    yield pending.popleft().result()
+                pending.append(pool.submit(_extract_page_range, pdf_file.name, start, end))
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _read_pdf_bytes(pdf) -> bytes:
     pdf.seek(0)
+    data = pdf.read()
 
-    if file_size > MAX_FILE_SIZE:
+    if len(data) > MAX_FILE_SIZE:
         raise RuntimeError(f"O arquivo PDF excede o limite de 5MB.")
 
-    text = ''
+    return data
+
+def iter_pdf_pages(data: bytes, reader: PyPDF2.PdfReader = None) -> Iterator[str]:
+    reader = reader or PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        for page_num in range(page_count):
+            yield reader.pages[page_num].extract_text()
+    else:
+        yield from _extract_pages_parallel(data, page_count)
+
+def pdf_to_text(pdf) -> str:
+    data = _read_pdf_bytes(pdf)
+
+    cache_key = pdf_text_cache.key_for(data)
+    cached_text = pdf_text_cache.get(cache_key)
+    if cached_text is not None:
+        return cached_text
+
     try:
-        reader = PyPDF2.PdfReader(pdf)
-        for page_num in range(len(reader.pages)):
-            text += reader.pages[page_num].extract_text()
+        text = ''.join(iter_pdf_pages(data))
     except Exception as e:
         raise RuntimeError(f"Error processing PDF file: {e}")
 
+    pdf_text_cache.put(cache_key, text)
+
     return text
 
-def fragment_text(text_content: str) -> List[str]:
-    token_count = token_counter(text_content)
+def stream_pdf_fragments(pdf) -> Tuple[Iterator[str], int]:
+    """
+    Returns a generator of text fragments of at most MAX_TOKENS tokens, produced
+    while the PDF pages are still being extracted, and an estimate of how many
+    fragments it will yield.
+
+    Cached documents are fragmented from the cached text, so the estimate is exact.
+    Otherwise the pages are also streamed to the text cache as they are read.
+    """
+    data = _read_pdf_bytes(pdf)
+
+    cache_key = pdf_text_cache.key_for(data)
+    cached_text = pdf_text_cache.get(cache_key)
+    if cached_text is not None:
+        fragments = fragment_text(cached_text)
+        return iter(fragments), len(fragments)
+
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(reader.pages)
+    except Exception as e:
+        raise RuntimeError(f"Error processing PDF file: {e}")
+
+    max_tokens = int(os.getenv('MAX_TOKENS'))
+    estimated_fragments = max(1, -(-page_count * AVG_TOKENS_PER_PAGE // max_tokens))
+
+    return _iter_uncached_fragments(data, reader, cache_key), estimated_fragments
+
+def _iter_uncached_fragments(data: bytes, reader: PyPDF2.PdfReader, cache_key: str) -> Iterator[str]:
+    cache_writer = pdf_text_cache.open_writer(cache_key)
+
+    def pages():
+        for page_text in iter_pdf_pages(data, reader):
+            cache_writer.write(page_text)
+            yield page_text
+
+    try:
+        yield from iter_text_fragments(pages())
+        cache_writer.commit()
+    except Exception as e:
+        raise RuntimeError(f"Error processing PDF file: {e}")
+    finally:
+        cache_writer.discard()
+
+def iter_text_fragments(texts: Iterable[str]) -> Iterator[str]:
+    """
+    Groups consecutive texts (usually PDF pages) into fragments of at most
+    MAX_TOKENS tokens, yielding each one as soon as it is full. The texts are
+    encoded once, cut on token boundaries (at a paragraph or sentence break
+    when there is one in the second half of the fragment) and each slice is
+    decoded back. Only the tokens of the fragment being built are kept.
+    """
+    encoder = _get_encoder()
     max_token = int(os.getenv('MAX_TOKENS'))
-    
-    if token_count <= max_token:
-        return [text_content]
-    
-    num_parts = (token_count // max_token) + (1 if token_count % max_token else 0)
-    tokens_per_part = token_count // num_parts
 
-    words = text_content.split()
-    fragments = [
-        " ".join(words[i:i+tokens_per_part]) for i in range(0, len(words), tokens_per_part)
-    ]
+    tokens: List[int] = []
+
+    for text in texts:
+        tokens.extend(encoder.encode(text, disallowed_special=()))
+
+        while len(tokens) > max_token:
+            cut = _fragment_cut(encoder.decode_tokens_bytes(tokens[:max_token]))
+            yield encoder.decode(tokens[:cut])
+            tokens = tokens[cut:]
+
+    if tokens:
+        yield encoder.decode(tokens)
+
+def _fragment_cut(token_bytes: List[bytes]) -> int:
+    """
+    Returns how many of the given tokens go into the fragment, preferring to
+    end it right after a paragraph break, then after a sentence, and finally
+    on any UTF-8 character boundary.
+    """
+    data = b''.join(token_bytes)
+    floor = len(data) // 2
+
+    cut = data.rfind(b'\n\n', floor)
+    if cut != -1:
+        cut += 2
+    else:
+        cut = None
+        for match in _SENTENCE_END.finditer(data, floor):
+            cut = match.end()
+
+    if cut is not None:
+        consumed = 0
+        for index, chunk in enumerate(token_bytes):
+            consumed += len(chunk)
+            if consumed > cut:
+                return index or len(token_bytes)
+        return len(token_bytes)
+
+    cut = len(token_bytes)
+    while cut > 1:
+        try:
+            b''.join(token_bytes[:cut]).decode('utf-8')
+            break
+        except UnicodeDecodeError:
+            cut -= 1
+    return cut
+
+def fragment_text(text_content: str) -> List[str]:
+    return list(iter_text_fragments([text_content])) or [text_content]
+
+def normalize_question(question: str) -> str:
+    return re.sub(r'\W+', ' ', question.lower()).strip()
 
-    return fragments
+@lru_cache(maxsize=None)
+def _get_encoder() -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model('gpt-4-turbo')
 
 def token_counter(text: str) -> int:
-    coder = tiktoken.encoding_for_model('gpt-4-turbo')
-    token_list = coder.encode(text)
+    coder = _get_encoder()
+    token_list = coder.encode(text, disallowed_special=())
     size = len(token_list)
     
     return size